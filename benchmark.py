@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from grafikler import BATCH_BACKEND, CHARTS, chart_data, render_charts
+from hazirlik import (BASKET_FILE, CUSTOMER_FILE, CustomerIndex, add_features, clean_customers,
+                      parse_basket_dates, read_basket, read_customers)
+from olcum import Profiler
+from paralel import aggregate_parallel
+from sentetik_veri import generate
+from toplama import ANALYSES, SalesAggregator, aggregate_stream
+
+RESULTS_DIR = 'benchmark_sonuclari'
+
+
+# ============================================================
+# PIPELINE AŞAMALARI
+# ============================================================
+
+def run_pipeline(data_dir, profiler, charts=True, stream_chunksize=None, parallel_workers=()):
+    """analiz.py'nin aşamalarını tek tek ölçer; müşteri satırı sayısını döner."""
+    basket_path = os.path.join(data_dir, BASKET_FILE)
+    customer_path = os.path.join(data_dir, CUSTOMER_FILE)
+
+    with profiler.stage('load'):
+        df_basket = read_basket(basket_path)
+        df_customer = read_customers(customer_path)
+    with profiler.stage('clean'):
+        df_basket = parse_basket_dates(df_basket)
+        df_customer = clean_customers(df_customer)
+    with profiler.stage('merge'):
+        customer_index = CustomerIndex(df_customer)
+        df_merge = customer_index.enrich(df_basket)
+    with profiler.stage('features'):
+        df_merge = add_features(df_merge)
+    with profiler.stage('aggregate'):
+        aggregator = SalesAggregator().update(df_merge)
+    with profiler.stage('summarize'):
+        summary = aggregator.result()
+    for name, analysis in ANALYSES.items():
+        with profiler.stage(f'analysis:{name}'):
+            analysis(summary)
+
+    if charts:
+        with tempfile.TemporaryDirectory() as output_dir:
+            timings = render_charts(chart_data(summary), workers=1, output_dir=output_dir, use_cache=False)
+        for number, filename, _, _ in CHARTS:
+            profiler.record(f'chart:{filename}', *timings[number])
+
+    if stream_chunksize:
+        del df_basket, df_merge
+        with profiler.stage('stream:aggregate'):
+            aggregate_stream(CustomerIndex(df_customer), basket_path, stream_chunksize).result()
+    for workers in parallel_workers:
+        with profiler.stage(f'parallel:aggregate:{workers}'):
+            aggregate_parallel(CustomerIndex(df_customer), basket_path, workers).result()
+    return len(df_customer)
+
+
+# ============================================================
+# ÇALIŞTIRMA
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='analiz.py pipeline benchmark')
+    parser.add_argument('--satir', type=float, nargs='+', default=[1e5],
+                        help='Sentetik sepet satırı sayıları (örn. 1e5 1e6 1e7)')
+    parser.add_argument('--veri-dizini',
+                        help='Sentetik veri üretmek yerine bu klasördeki CSV dosyalarını kullan')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Aşama başına Python bellek tepe değerini de ölç (süreleri yavaşlatır)')
+    parser.add_argument('--grafiksiz', action='store_true', help='Grafik çizim aşamalarını atla')
+    parser.add_argument('--akis', type=int, metavar='PARCA', help='Akış modunu da bu parça boyutuyla ölç')
+    parser.add_argument('--paralel', type=int, nargs='+', default=[], metavar='ISCI',
+                        help='Paralel toplamayı bu işçi sayılarıyla da ölç (örn. 1 8 32)')
+    parser.add_argument('--karsilastir', metavar='JSON', help='Önceki bir sonuç dosyasıyla karşılaştır')
+    parser.add_argument('--cikti-dizini', default=RESULTS_DIR, help='JSON sonuçlarının yazılacağı klasör')
+    args = parser.parse_args()
+    os.environ['MPLBACKEND'] = BATCH_BACKEND
+
+    baseline = None
+    if args.karsilastir:
+        with open(args.karsilastir, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    os.makedirs(args.cikti_dizini, exist_ok=True)
+    sizes = [None] if args.veri_dizini else [int(n) for n in args.satir]
+
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = args.veri_dizini or tmp
+            if n_rows is not None:
+                print(f"\n🧪 {n_rows:,} satırlık sentetik veri üretiliyor...")
+                generate(data_dir, n_rows)
+            input_mb = sum(os.path.getsize(os.path.join(data_dir, f)) for f in (BASKET_FILE, CUSTOMER_FILE)) / 1e6
+            profiler = Profiler(trace_memory=args.tracemalloc)
+            n_customers = run_pipeline(data_dir, profiler, charts=not args.grafiksiz,
+                                       stream_chunksize=args.akis, parallel_workers=args.paralel)
+
+        n_label = n_rows if n_rows is not None else 'veri'
+        report = profiler.to_dict(basket_rows=n_rows, customer_rows=n_customers, input_mb=input_mb,
+                                  data_dir=args.veri_dizini, pandas=pd.__version__, numpy=np.__version__)
+        report['total_seconds'] = sum(s['seconds'] for s in profiler.records)
+        path = os.path.join(args.cikti_dizini,
+                            f"benchmark_{n_label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print(f"\n📊 Sonuçlar ({n_label} satır, {input_mb:.1f} MB girdi):")
+        print(profiler.summary_table(baseline))
+        print(f"   Toplam: {report['total_seconds']:.2f} sn → {path}")
+
+
+if __name__ == '__main__':
+    main()
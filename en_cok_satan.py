@@ -0,0 +1,273 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from tekil_sayim import hash64, sorted_unique
+
+# ============================================================
+# EN ÇOK / EN AZ SATAN ÜRÜNLER (TOP-K)
+# ============================================================
+# top_k       Kesin sonuç. Tüm tabloyu sıralamak yerine np.partition ile yalnızca
+#             k'ıncı değer bulunur (O(n)); sıralama sadece seçilen k satırda yapılır.
+#             Eşit değerler tablodaki sırayla gelir (kararlı sort_values ile aynı),
+#             bu yüzden eşitlik olsa da tablo sıralanmaz.
+# Akış modu   Ürün tablosu belleğe sığmayacak kadar büyükse sabit bellekle yaklaşık
+#             sonuç. Ürün başına toplam (sum) bir üst sınır tahminidir:
+#   SpaceSaving    En fazla capacity ürün izlenir; toplam satışların 1/capacity'sinden
+#                  fazlasını yapan her ürünün listede olması garantidir. error sütunu
+#                  tahminin en fazla ne kadar yüksek olabileceğini verir
+#                  (sum - error ≤ gerçek toplam ≤ sum).
+#   CountMinSketch depth × width sayaçlık tablo; her ürünün tahmini ≥ gerçek değer,
+#                  fazlası (1 - e^-depth) olasılıkla en fazla e/width × toplam.
+
+SKETCH_WIDTH = 1 << 16
+SKETCH_DEPTH = 4
+_ROW_SEED = 0x5851F42D4C957F2D
+
+
+def top_k(table, k, column='sum', ascending=False):
+    """table'ın column değerine göre en büyük (ascending=True ise en küçük) k satırı.
+
+    Sonuç table.sort_values(column, ascending=ascending, kind='stable').head(k)
+    ile aynıdır: eşit değerli satırlar tablodaki sıralarıyla gelir. k'ıncı
+    değerden kesin iyi satırlar ve k'ya tamamlayacak kadar k'ıncı değere eşit
+    satır seçilir; yalnızca bu k satır (değer, konum) sırasına dizilir.
+    """
+    n = len(table)
+    k = max(0, min(int(k), n))
+    if k == 0 or k == n:
+        return table.sort_values(column, ascending=ascending, kind='stable').head(k)
+
+    values = table[column].to_numpy()
+    key = values if ascending else -values
+    kth = np.partition(key, k - 1)[k - 1]
+    better = np.flatnonzero(key < kth)
+    tied = np.flatnonzero(key == kth)[:k - len(better)]
+    chosen = np.concatenate([better, tied])
+    return table.iloc[chosen[np.lexsort((chosen, key[chosen]))]]
+
+
+def product_totals(df):
+    """Bir parçanın ürün başına (sum, count) tablosu (toplama.SalesAggregator ile aynı)."""
+    return df.groupby('product_id')['basket_count'].agg(['sum', 'count']).astype('int64')
+
+
+# ============================================================
+# AKIŞ MODU: SPACE-SAVING
+# ============================================================
+
+class SpaceSaving:
+    """En çok satan ürünler için sabit boyutlu Space-Saving özeti.
+
+    Her parça önce ürün başına toplanır, sonra özetle birleştirilip en büyük
+    capacity ürün tutulur. İzlenmeyen bir ürün listeye girerken o ana kadarki
+    satışlarının en fazla floor kadar olabileceği varsayılır (error = floor).
+    Sipariş sayısı (count) ürün izlenmeye başladığından beri görülenlerdir;
+    error = 0 olan ürünlerde sum ve count kesindir.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.floor = 0
+        self._table = pd.DataFrame({'sum': [], 'count': [], 'error': []}, dtype='int64',
+                                   index=pd.Index([], dtype='int64', name='product_id'))
+
+    def update(self, df):
+        """Sepet satırlarından (product_id, basket_count) oluşan bir parçayı ekler."""
+        return self.update_totals(product_totals(df))
+
+    def update_totals(self, totals):
+        """Ürün başına önceden toplanmış (sum, count) tablosunu ekler."""
+        if len(totals) == 0:
+            return self
+        table = self._table.reindex(self._table.index.union(totals.index))
+        table = table.fillna({'sum': self.floor, 'count': 0, 'error': self.floor}).astype('int64')
+        table[['sum', 'count']] += totals.reindex(table.index, fill_value=0)[['sum', 'count']]
+
+        if len(table) > self.capacity:
+            kept = top_k(table, self.capacity)
+            self.floor = max(self.floor, int(table['sum'].drop(kept.index).max()))
+            table = kept.sort_index()
+        self._table = table
+        return self
+
+    def merge(self, other):
+        """Başka bir özeti (örn. paralel okunan bir dosya parçası) birleştirir."""
+        floor = self.floor + other.floor
+        table = self._table.add(other._table, fill_value=0)
+        only_self = ~self._table.index.isin(other._table.index)
+        only_other = ~other._table.index.isin(self._table.index)
+        # Bir tarafta izlenmeyen ürün o tarafta en fazla floor kadar satmış olabilir
+        table.loc[self._table.index[only_self], ['sum', 'error']] += other.floor
+        table.loc[other._table.index[only_other], ['sum', 'error']] += self.floor
+        table = table.astype('int64')
+        if len(table) > self.capacity:
+            kept = top_k(table, self.capacity)
+            floor = max(floor, int(table['sum'].drop(kept.index).max()))
+            table = kept.sort_index()
+        self._table, self.floor = table, floor
+        return self
+
+    def result(self, k=10, errors=False):
+        """Tahmini en çok satan k ürün; errors=True ise üst sınır payı (error) da eklenir."""
+        table = top_k(self._table, k)
+        return table if errors else table[['sum', 'count']]
+
+    @property
+    def nbytes(self):
+        return int(self._table.memory_usage(index=True).sum())
+
+
+# ============================================================
+# AKIŞ MODU: COUNT-MIN SKETCH
+# ============================================================
+
+class CountMinSketch:
+    """Ürün başına toplamlar için Count-Min sketch; tahminler hiçbir zaman düşük değildir."""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, ids):
+        ids = np.asarray(ids).astype(np.uint64)
+        # Her satır farklı bir tohumla karıştırılmış aynı splitmix64 karmasını kullanır
+        return [(hash64(ids ^ np.uint64(_ROW_SEED * (row + 1) % 2**64)) % np.uint64(self.width)).astype(np.intp)
+                for row in range(self.depth)]
+
+    def update(self, ids, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        for row, columns in enumerate(self._columns(ids)):
+            # float64 toplamlar 2^53'e kadar kesindir
+            self.table[row] += np.bincount(columns, weights=weights, minlength=self.width).astype(np.int64)
+        return self
+
+    def estimate(self, ids):
+        return np.min([self.table[row, columns] for row, columns in enumerate(self._columns(ids))], axis=0)
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError('Yalnızca aynı boyuttaki sketch\'ler birleştirilebilir')
+        self.table += other.table
+        return self
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+
+class CountMinTopK:
+    """Count-Min sketch'lerle (toplam ve sipariş sayısı) en çok satan ürün adayları.
+
+    Her parçadan sonra eski adaylar ve parçadaki ürünler sketch'ten tahmin edilip
+    en büyük capacity tanesi aday olarak kalır.
+    """
+
+    def __init__(self, capacity=1000, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.capacity = capacity
+        self.sums = CountMinSketch(width, depth)
+        self.counts = CountMinSketch(width, depth)
+        self.candidates = np.array([], dtype=np.int64)
+
+    def update(self, df):
+        return self.update_totals(product_totals(df))
+
+    def update_totals(self, totals):
+        if len(totals) == 0:
+            return self
+        ids = totals.index.to_numpy()
+        self.sums.update(ids, totals['sum'].to_numpy())
+        self.counts.update(ids, totals['count'].to_numpy())
+        candidates = sorted_unique(np.concatenate([self.candidates, ids]))
+        if len(candidates) > self.capacity:
+            candidates = np.sort(top_k(self._estimate(candidates), self.capacity).index.to_numpy())
+        self.candidates = candidates
+        return self
+
+    def _estimate(self, ids):
+        return pd.DataFrame({'sum': self.sums.estimate(ids), 'count': self.counts.estimate(ids)},
+                            index=pd.Index(ids, name='product_id'))
+
+    def result(self, k=10):
+        return top_k(self._estimate(self.candidates), k)
+
+    @property
+    def nbytes(self):
+        return self.sums.nbytes + self.counts.nbytes + self.candidates.nbytes
+
+
+def heavy_hitters(method='space_saving', capacity=1000, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+    """Yönteme göre ('space_saving' veya 'count_min') akış özetini oluşturur."""
+    if method == 'space_saving':
+        return SpaceSaving(capacity)
+    if method == 'count_min':
+        return CountMinTopK(capacity, width, depth)
+    raise ValueError(f"Bilinmeyen yöntem: {method} ('space_saving' veya 'count_min')")
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(df, k=10, capacity=1000, chunksize=100_000):
+    """Tam sıralama, kısmi seçim ve akış özetlerini süre, bellek ve doğruluk açısından karşılaştırır."""
+    products = product_totals(df)
+    expected, sort_seconds = _timed(lambda: products.sort_values('sum', ascending=False, kind='stable').head(k))
+    exact, seconds = _timed(lambda: top_k(products, k))
+    bottom, bottom_seconds = _timed(lambda: top_k(products, k, ascending=True))
+    assert exact.equals(expected)
+
+    print(f"📦 {len(products):,} ürün, k={k}\n")
+    print(f"{'Yöntem':<26} {'Süre (sn)':>10} {'Durum (KB)':>11} {'Bulunan':>8} {'Toplam hatası (%)':>18}")
+    print(f"{'tam sıralama (sort_values)':<26} {sort_seconds:>10.4f} {'-':>11} {k:>8} {0:>18.2f}")
+    print(f"{'kısmi seçim (top_k)':<26} {seconds:>10.4f} {'-':>11} {k:>8} {0:>18.2f}")
+    print(f"{'kısmi seçim, en az satan':<26} {bottom_seconds:>10.4f} {'-':>11} {k:>8} {'-':>18}")
+
+    for method in ['space_saving', 'count_min']:
+        summary = heavy_hitters(method, capacity)
+
+        def feed():
+            for start in range(0, len(df), chunksize):
+                summary.update(df.iloc[start:start + chunksize])
+            return summary.result(k)
+        found, seconds = _timed(feed)
+        recall = len(found.index.intersection(exact.index))
+        truth = products['sum'].reindex(found.index)
+        error = ((found['sum'] - truth).abs() / truth).max() * 100
+        print(f"{f'{method} (capacity={capacity})':<26} {seconds:>10.3f} {summary.nbytes / 1e3:>11,.0f} "
+              f"{recall:>5}/{k:<2} {error:>18.2f}")
+    print(f"   (akış yöntemleri {chunksize:,} satırlık parçalarla beslenir; "
+          f"hata: bulunan ürünlerdeki en büyük göreli toplam farkı)")
+
+
+if __name__ == '__main__':
+    from hazirlik import BASKET_FILE, read_basket
+    from sentetik_veri import generate
+
+    parser = argparse.ArgumentParser(description='Kesin ve akış modunda en çok satan ürünler benchmark\'ı')
+    parser.add_argument('--satir', type=float, default=1e6, help='Sentetik sepet satırı sayısı')
+    parser.add_argument('--veri-dizini', help='Sentetik veri yerine bu klasördeki basket_details.csv')
+    parser.add_argument('--k', type=int, default=10, help='Listelenecek ürün sayısı')
+    parser.add_argument('--kapasite', type=int, default=1000, help='Akış özetlerinin izlediği ürün sayısı')
+    parser.add_argument('--parca-boyutu', type=int, default=100_000, help='Akış modunda parça boyutu')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.veri_dizini or tmp
+        if not args.veri_dizini:
+            print(f"🧪 {int(args.satir):,} satırlık sentetik veri üretiliyor...")
+            generate(data_dir, int(args.satir))
+        df = read_basket(os.path.join(data_dir, BASKET_FILE))
+    print(f"📊 {len(df):,} sepet satırı")
+    run_benchmark(df, k=args.k, capacity=args.kapasite, chunksize=args.parca_boyutu)
@@ -0,0 +1,299 @@
+import argparse
+import bz2
+import glob
+import gzip
+import importlib.util
+import io
+import lzma
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from hazirlik import BASKET_FILE, read_basket
+from kolon_deposu import BasketStore, is_store
+
+# ============================================================
+# ÇOK DOSYALI VE SIKIŞTIRILMIŞ SEPET GİRDİSİ
+# ============================================================
+# Sepet verisi tek bir CSV yerine bir glob deseni, bir klasör ya da dosya listesi
+# olarak verilebilir (örn. 'disari_aktarim/sepet_*.csv.gz'). Dosyalar .gz, .bz2,
+# .xz, .zst (zstandard paketi gerekir) veya düz .csv olabilir.
+#
+#   - Dosya adında (veya klasör yolunda) tarih varsa (2019-06-13, 20190613,
+#     basket_date=2019-06-13/...) tarih aralığı dışındaki dosyalar hiç açılmaz;
+#     tarihi bilinmeyen dosyalar okunup satır bazında süzülür.
+#   - Dosyalar iş parçacıklarında (varsayılan) veya süreçlerde paralel açılıp
+#     ayrıştırılır. zlib/lzma açma ve pandas'ın CSV ayrıştırıcısı GIL'i
+#     bıraktığından iş parçacıkları da birden çok çekirdek kullanır.
+#   - Her dosya için sıkıştırılmış ve açılmış bayt, satır ve süre tutulur
+#     (MB/s raporu).
+
+# Klasör verildiğinde okunan uzantılar
+BASKET_EXTENSIONS = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.csv.zst')
+
+_DATE_PATTERN = re.compile(r'(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?!\d)')
+
+
+def zstd_available():
+    """.zst dosyaları için isteğe bağlı zstandard paketi kurulu mu?"""
+    return importlib.util.find_spec('zstandard') is not None
+
+
+def _open_zstd(path):
+    if not zstd_available():
+        raise ImportError(f".zst dosyaları için zstandard paketi gerekli (pip install zstandard): {path}")
+    import zstandard
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.zst': _open_zstd}
+
+
+class _CountingReader(io.RawIOBase):
+    """Açılmış (decompressed) baytları sayan okuyucu."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        self.bytes_read += n or 0
+        return n
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def open_decoded(path):
+    """Dosyayı uzantısına göre açılmış bayt akışı olarak açar; (akış, sayaç) döner."""
+    opener = _OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    counter = _CountingReader(opener(path, 'rb'))
+    return io.BufferedReader(counter, buffer_size=1 << 20), counter
+
+
+def partition_date(path):
+    """Dosya adındaki (yoksa klasör yolundaki) son tarih; bulunamazsa None."""
+    for part in reversed(os.path.normpath(path).split(os.sep)):
+        for match in reversed(list(_DATE_PATTERN.finditer(part))):
+            try:
+                return pd.Timestamp(f'{match[1]}-{match[2]}-{match[3]}')
+            except ValueError:
+                continue
+    return None
+
+
+def expand_sources(spec):
+    """Glob deseni, klasör, dosya yolu veya bunların listesini sıralı dosya listesine çevirir."""
+    if isinstance(spec, (list, tuple)):
+        return [path for item in spec for path in expand_sources(item)]
+    spec = os.fspath(spec)
+    if glob.has_magic(spec):
+        paths = glob.glob(spec, recursive=True)
+    elif os.path.isdir(spec):
+        paths = [os.path.join(root, name) for root, _, names in os.walk(spec)
+                 for name in names if name.lower().endswith(BASKET_EXTENSIONS)]
+    else:
+        return [spec]
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def source_paths(spec):
+    """Değişiklik kontrolünde parmak izi alınacak yollar; kolon deposu tek bir kaynaktır."""
+    if isinstance(spec, (str, os.PathLike)) and is_store(spec):
+        return [os.fspath(spec)]
+    return expand_sources(spec)
+
+
+def prune(paths, start=None, end=None):
+    """Dosya adındaki tarihi [start, end] dışında kalan bölümleri eler."""
+    start = None if start is None else pd.Timestamp(start).normalize()
+    end = None if end is None else pd.Timestamp(end).normalize()
+    kept = []
+    for path in paths:
+        day = partition_date(path)
+        if day is not None and ((start is not None and day < start) or (end is not None and day > end)):
+            continue
+        kept.append(path)
+    return kept
+
+
+def _read_file(path, start, end, chunksize=None):
+    """Tek bir dosyayı okur; (DataFrame veya parça iterator'ı, istatistik) döner."""
+    stream, counter = open_decoded(path)
+    stats = {'path': path, 'compressed_bytes': os.path.getsize(path), 'decoded_bytes': 0, 'rows': 0,
+             'seconds': 0.0}
+
+    def select(frame):
+        if start is not None:
+            frame = frame[frame['basket_date'] >= start]
+        if end is not None:
+            frame = frame[frame['basket_date'] < end + pd.Timedelta(days=1)]
+        return frame
+
+    if not chunksize:
+        began = time.perf_counter()
+        with stream:
+            frame = select(read_basket(stream))
+        stats.update(decoded_bytes=counter.bytes_read, rows=len(frame), seconds=time.perf_counter() - began)
+        return frame, stats
+
+    def chunks():
+        # Süreye yalnızca okuma/ayrıştırma girer; parçayı tüketen kodun süresi girmez
+        began = time.perf_counter()
+        with stream:
+            for chunk in read_basket(stream, chunksize=chunksize):
+                chunk = select(chunk)
+                stats['rows'] += len(chunk)
+                stats['seconds'] += time.perf_counter() - began
+                yield chunk
+                began = time.perf_counter()
+        stats['seconds'] += time.perf_counter() - began
+        stats['decoded_bytes'] = counter.bytes_read
+    return chunks(), stats
+
+
+def _read_file_in_process(path, start, end):
+    return _read_file(path, start, end)
+
+
+class BasketSources:
+    """Birden çok (sıkıştırılmış olabilen) sepet dosyası; read_basket'e yol yerine verilebilir.
+
+    read_frames() tüm dosyaları workers iş parçacığında (executor='process' ile
+    süreçte) paralel okuyup dosya sırasıyla birleştirir; chunksize verilirse
+    dosyalar sırayla, parça parça akıtılır. Okunan her dosyanın istatistiği
+    stats listesinde birikir.
+    """
+
+    def __init__(self, spec, start=None, end=None, workers=None, executor='thread'):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Bilinmeyen yürütücü: {executor} ('thread' veya 'process')")
+        self.spec = spec
+        self.start = None if start is None else pd.Timestamp(start).normalize()
+        self.end = None if end is None else pd.Timestamp(end).normalize()
+        self.all_paths = expand_sources(spec)
+        self.paths = prune(self.all_paths, self.start, self.end)
+        # Dosya adındaki gün dosyanın günüdür (prune da bunu varsayar); dosyalar gün
+        # sırasındaysa akış güne göre sıralıdır (bkz. temizlik.Cleaner.advance)
+        days = [partition_date(path) for path in self.paths]
+        self.day_ordered = None not in days and days == sorted(days)
+        self.workers = workers or min(len(self.paths), os.cpu_count() or 1) or 1
+        self.executor = executor
+        self.stats = []
+
+    def __len__(self):
+        return len(self.paths)
+
+    @property
+    def pruned(self):
+        """Tarih aralığı dışında kaldığı için açılmayan dosya sayısı."""
+        return len(self.all_paths) - len(self.paths)
+
+    def read_frames(self, chunksize=None):
+        if not self.paths:
+            raise FileNotFoundError(f"Sepet dosyası bulunamadı: {self.spec}")
+        if chunksize:
+            return self._chunks(chunksize)
+
+        if self.workers == 1 or len(self.paths) == 1:
+            results = [_read_file(path, self.start, self.end) for path in self.paths]
+        elif self.executor == 'process':
+            with ProcessPoolExecutor(self.workers) as pool:
+                results = list(pool.map(_read_file_in_process, self.paths,
+                                        [self.start] * len(self.paths), [self.end] * len(self.paths)))
+        else:
+            with ThreadPoolExecutor(self.workers) as pool:
+                results = list(pool.map(lambda path: _read_file(path, self.start, self.end), self.paths))
+        self.stats.extend(stats for _, stats in results)
+        return pd.concat([frame for frame, _ in results], ignore_index=True)
+
+    def _chunks(self, chunksize):
+        for path in self.paths:
+            chunks, stats = _read_file(path, self.start, self.end, chunksize)
+            yield from chunks
+            self.stats.append(stats)
+
+    def throughput(self, seconds=None):
+        """Okunan dosyaların toplam (sıkıştırılmış MB, açılmış MB, satır, saniye)."""
+        compressed = sum(s['compressed_bytes'] for s in self.stats) / 1e6
+        decoded = sum(s['decoded_bytes'] for s in self.stats) / 1e6
+        rows = sum(s['rows'] for s in self.stats)
+        return compressed, decoded, rows, seconds if seconds is not None else sum(s['seconds'] for s in self.stats)
+
+
+def open_basket(spec=BASKET_FILE, start=None, end=None, workers=None):
+    """Sepet kaynağını read_basket'in kabul ettiği biçime çevirir.
+
+    Kolon deposu → BasketStore (tarih aralığı varsa görünümü), glob/klasör/liste
+    ya da sıkıştırılmış dosya veya tarih aralığı → BasketSources; tek düz CSV
+    yolu olduğu gibi döner.
+    """
+    if isinstance(spec, (str, os.PathLike)) and is_store(spec):
+        store = BasketStore(spec)
+        return store if start is None and end is None else store.between(start, end)
+    plain = (isinstance(spec, (str, os.PathLike)) and not glob.has_magic(os.fspath(spec))
+             and not os.path.isdir(spec) and os.path.splitext(spec)[1].lower() not in _OPENERS)
+    if plain and start is None and end is None:
+        return spec
+    return BasketSources(spec, start=start, end=end, workers=workers)
+
+
+# ============================================================
+# YARDIMCI: GÜNLÜK BÖLÜMLERE AYIRMA VE BENCHMARK
+# ============================================================
+
+def split_daily(csv_path, output_dir, compression='gzip'):
+    """Tek bir sepet CSV'sini sepet_YYYY-MM-DD.csv[.gz] günlük bölümlerine yazar."""
+    suffix = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst', None: ''}[compression]
+    os.makedirs(output_dir, exist_ok=True)
+    df = pd.read_csv(csv_path, encoding='utf-8', dtype=str)
+    for day, part in df.groupby('basket_date', sort=True):
+        part.to_csv(os.path.join(output_dir, f'sepet_{day}.csv{suffix}'), index=False,
+                    compression=compression)
+    return df['basket_date'].nunique()
+
+
+def run_benchmark(spec, worker_counts, start=None, end=None):
+    """Farklı işçi sayıları ve yürütücülerle okuma hızını (MB/s) ölçer."""
+    print(f"{'Yürütücü':<9} {'İşçi':>5} {'Dosya':>6} {'Satır':>12} {'Süre (sn)':>10} "
+          f"{'Sıkıştırılmış MB/s':>19} {'Açılmış MB/s':>13}")
+    for executor in ['thread', 'process']:
+        for workers in worker_counts:
+            sources = BasketSources(spec, start=start, end=end, workers=workers, executor=executor)
+            began = time.perf_counter()
+            frame = sources.read_frames()
+            seconds = time.perf_counter() - began
+            compressed, decoded, _, _ = sources.throughput(seconds)
+            print(f"{executor:<9} {workers:>5} {len(sources):>6} {len(frame):>12,} {seconds:>10.2f} "
+                  f"{compressed / seconds:>19.1f} {decoded / seconds:>13.1f}")
+    if sources.pruned:
+        print(f"   ({sources.pruned} dosya tarih aralığı dışında kaldığı için açılmadı)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Çok dosyalı / sıkıştırılmış sepet girdisi')
+    parser.add_argument('kaynak', nargs='?', help='Glob deseni veya klasör (örn. "bolumler/*.csv.gz")')
+    parser.add_argument('--bol', nargs=2, metavar=('CSV', 'DIZIN'),
+                        help='CSV\'yi DIZIN altına günlük sıkıştırılmış bölümlere ayır')
+    parser.add_argument('--sikistirma', default='gzip', choices=['gzip', 'bz2', 'xz', 'zstd', 'yok'],
+                        help='--bol için sıkıştırma (varsayılan: gzip)')
+    parser.add_argument('--baslangic', help='Bu günden (dahil) önceki bölümleri atla')
+    parser.add_argument('--bitis', help='Bu günden (dahil) sonraki bölümleri atla')
+    parser.add_argument('--isci', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help='Denenecek işçi sayıları')
+    args = parser.parse_args()
+
+    if args.bol:
+        compression = None if args.sikistirma == 'yok' else args.sikistirma
+        days = split_daily(*args.bol, compression=compression)
+        print(f"📁 {days} günlük bölüm yazıldı → {args.bol[1]}")
+    if args.kaynak:
+        run_benchmark(args.kaynak, sorted(set(args.isci)), start=args.baslangic, end=args.bitis)
@@ -0,0 +1,303 @@
+import hashlib
+import importlib.metadata
+import inspect
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from en_cok_satan import top_k
+from hazirlik import DAY_LABELS_TR, DAY_ORDER
+
+
+# ============================================================
+# MATPLOTLIB AYARLARI
+# ============================================================
+# matplotlib yalnızca ilk grafik çizilirken yüklenir; modülü yalnızca
+# rapor tabloları için içe aktaran araçlar bu maliyeti ödemez.
+# Backend yalnızca işçi süreçlerde ve komut satırında (analiz.py) Agg yapılır;
+# grafikleri kendi sürecinde çizen kütüphane/notebook kullanıcısının backend'i değişmez.
+plt = None
+BATCH_BACKEND = 'Agg'
+
+
+def setup_matplotlib(backend=None):
+    """Tüm grafiklerde kullanılan stil; her işçi süreçte de bir kez uygulanır."""
+    global plt
+    import matplotlib
+    if backend is not None:
+        matplotlib.use(backend)
+    if plt is None:
+        import matplotlib.pyplot as plt
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.style.use('ggplot')
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['axes.titlesize'] = 14
+    plt.rcParams['axes.labelsize'] = 11
+
+
+# ============================================================
+# GRAFİKLER
+# ============================================================
+# Her fonksiyon yalnızca kendi toplu serisini alır; böylece grafikler
+# birbirinden bağımsız olarak ayrı süreçlerde çizilebilir.
+
+def plot_top_products(top_products_plot, path):
+    # Grafik 1: En Çok Satan 10 Ürün
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.barh(range(len(top_products_plot)), top_products_plot.values, color='#3498db')
+    ax.set_yticks(range(len(top_products_plot)))
+    ax.set_yticklabels([f'Ürün {pid}' for pid in top_products_plot.index])
+    ax.set_xlabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax.set_title('En Çok Satan 10 Ürün', fontsize=14, fontweight='bold', pad=20)
+    ax.invert_yaxis()
+    # Değerleri çubukların üzerine yaz
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        ax.text(width, bar.get_y() + bar.get_height()/2, f'{int(width):,}',
+                ha='left', va='center', fontsize=10, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_gender(gender_total, path):
+    # Grafik 2: Cinsiyet Bazlı Satış Dağılımı
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Pasta grafiği
+    colors = ['#3498db', '#e74c3c', '#95a5a6']
+    wedges, texts, autotexts = ax1.pie(gender_total.values, labels=gender_total.index, autopct='%1.1f%%',
+                                         colors=colors, startangle=90, textprops={'fontsize': 11, 'fontweight': 'bold'})
+    ax1.set_title('Cinsiyet Bazlı Satış Dağılımı', fontsize=14, fontweight='bold', pad=20)
+
+    # Bar grafiği
+    gender_sales_plot = gender_total.sort_values(ascending=False)
+    bars = ax2.bar(gender_sales_plot.index, gender_sales_plot.values, color=colors)
+    ax2.set_xlabel('Cinsiyet', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax2.set_title('Cinsiyet Bazlı Toplam Satışlar', fontsize=14, fontweight='bold', pad=20)
+    # Değerleri çubukların üzerine yaz
+    for bar in bars:
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_age_groups(age_sales_plot, path):
+    # Grafik 3: Yaş Grubu Bazlı Satış Analizi
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(age_sales_plot.index.astype(str), age_sales_plot.values, color='#2ecc71')
+    ax.set_xlabel('Yaş Grubu', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax.set_title('Yaş Grubu Bazlı Satış Analizi', fontsize=14, fontweight='bold', pad=20)
+    # Değerleri çubukların üzerine yaz
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_daily_trend(daily_sales_plot, path):
+    # Grafik 4: Günlük Satış Trendi
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(daily_sales_plot.index, daily_sales_plot.values, linewidth=2, color='#9b59b6', marker='o', markersize=4)
+    ax.fill_between(daily_sales_plot.index, daily_sales_plot.values, alpha=0.3, color='#9b59b6')
+    ax.set_xlabel('Tarih', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax.set_title('Günlük Satış Trendi', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_day_of_week(day_sales_plot, path):
+    # Grafik 5: Haftanın Günü Satış Analizi
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(DAY_LABELS_TR, day_sales_plot.values, color='#e67e22')
+    ax.set_xlabel('Haftanın Günü', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax.set_title('Haftanın Günü Bazlı Satış Analizi', fontsize=14, fontweight='bold', pad=20)
+    # Değerleri çubukların üzerine yaz
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_tenure(tenure_sales_plot, path):
+    # Grafik 6: Müşteri Sadakati (Tenure) Analizi
+    fig, ax = plt.subplots(figsize=(12, 6))
+    tenure_labels_plot = [label.replace(' (', '\n(') for label in tenure_sales_plot.index.astype(str)]
+    bars = ax.bar(tenure_labels_plot, tenure_sales_plot.values, color='#1abc9c')
+    ax.set_xlabel('Müşteri Sadakat Seviyesi (Tenure - Gün)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Toplam Satış Adedi', fontsize=12, fontweight='bold')
+    ax.set_title('Müşteri Sadakati Bazlı Satış Analizi', fontsize=14, fontweight='bold', pad=20)
+    # Değerleri çubukların üzerine yaz
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height):,}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_gender_age_heatmap(gender_age_pivot, path):
+    # Grafik 7: Cinsiyet ve Yaş Grubu Kombinasyonu (Heatmap)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    im = ax.imshow(gender_age_pivot.values, cmap='YlOrRd', aspect='auto')
+    ax.set_xticks(range(len(gender_age_pivot.columns)))
+    ax.set_yticks(range(len(gender_age_pivot.index)))
+    ax.set_xticklabels(gender_age_pivot.columns)
+    ax.set_yticklabels(gender_age_pivot.index)
+    ax.set_xlabel('Cinsiyet', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Yaş Grubu', fontsize=12, fontweight='bold')
+    ax.set_title('Cinsiyet ve Yaş Grubu Bazlı Satış Dağılımı (Heatmap)', fontsize=14, fontweight='bold', pad=20)
+    # Hücrelere değerleri yaz
+    for i in range(len(gender_age_pivot.index)):
+        for j in range(len(gender_age_pivot.columns)):
+            text = ax.text(j, i, f'{int(gender_age_pivot.values[i, j]):,}',
+                           ha="center", va="center", color="black", fontsize=9, fontweight='bold')
+    cbar = plt.colorbar(im, ax=ax)
+    cbar.set_label('Toplam Satış Adedi', rotation=270, labelpad=20, fontsize=11, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+# (numara, dosya adı, başlık, çizim fonksiyonu)
+CHARTS = [
+    (1, 'grafik_1_top_urunler.png', 'En Çok Satan 10 Ürün', plot_top_products),
+    (2, 'grafik_2_cinsiyet_analizi.png', 'Cinsiyet Bazlı Satış Dağılımı', plot_gender),
+    (3, 'grafik_3_yas_grubu_analizi.png', 'Yaş Grubu Bazlı Satış Analizi', plot_age_groups),
+    (4, 'grafik_4_gunluk_satis_trendi.png', 'Günlük Satış Trendi', plot_daily_trend),
+    (5, 'grafik_5_haftanin_gunu_analizi.png', 'Haftanın Günü Bazlı Satış Analizi', plot_day_of_week),
+    (6, 'grafik_6_musteri_sadakati_analizi.png', 'Müşteri Sadakati Analizi', plot_tenure),
+    (7, 'grafik_7_cinsiyet_yas_heatmap.png', 'Cinsiyet ve Yaş Grubu Heatmap', plot_gender_age_heatmap),
+]
+_PLOTTERS = {number: plot for number, _, _, plot in CHARTS}
+
+
+def chart_data(summary):
+    """Her grafiğin girdisi olan küçük toplu seriler (grafik numarasına göre)."""
+    return {
+        1: top_k(summary.products, 10)['sum'],
+        2: summary.sex['sum'],
+        3: summary.age_group['sum'].sort_index(ascending=True),
+        4: summary.daily,
+        5: summary.day_of_week['sum'].reindex(DAY_ORDER),
+        6: summary.tenure['sum'],
+        7: summary.gender_age,
+    }
+
+
+# ============================================================
+# PARALEL ÇİZİM
+# ============================================================
+
+def _render(number, data, path):
+    start, cpu_start = time.perf_counter(), time.process_time()
+    _PLOTTERS[number](data, path)
+    return number, time.perf_counter() - start, time.process_time() - cpu_start
+
+
+def render_png(number, data):
+    """Tek bir grafiği diske yazmadan PNG baytları olarak çizer."""
+    setup_matplotlib()
+    buffer = io.BytesIO()
+    _PLOTTERS[number](data, buffer)
+    return buffer.getvalue()
+
+
+def default_workers():
+    return min(len(CHARTS), os.cpu_count() or 1)
+
+
+# ============================================================
+# ÇİZİM ÖNBELLEĞİ
+# ============================================================
+# Grafiklerin yanında tutulan manifest, her PNG için girdi serisinin ve
+# stil/çizim kodunun özetini saklar; özet değişmediyse grafik yeniden çizilmez.
+MANIFEST_FILE = 'grafik_manifest.json'
+
+
+def chart_key(number, data):
+    """Grafiğin girdi verisi + çizim fonksiyonu + stil ayarlarından özet üretir."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+    digest.update(repr((columns, list(data.index.names), str(data.index.dtype))).encode('utf-8'))
+    digest.update(inspect.getsource(_PLOTTERS[number]).encode('utf-8'))
+    digest.update(inspect.getsource(setup_matplotlib).encode('utf-8'))
+    digest.update(importlib.metadata.version('matplotlib').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_charts(data, workers=None, output_dir='.', use_cache=True):
+    """Grafikleri çizer ve {numara: (duvar süresi, CPU süresi)} döner.
+
+    workers > 1 ise grafikler Agg backend'li bir süreç havuzunda eşzamanlı
+    çizilir; 1 ise aynı süreçte sırayla çizilir. Her iki yol da aynı
+    fonksiyonları ve stili kullandığından PNG çıktıları aynıdır.
+    use_cache=True iken özeti manifest ile aynı olan ve dosyası duran
+    grafikler atlanır; bunlar için süre yerine None döner.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path) if use_cache else {}
+    keys = {number: chart_key(number, data[number]) for number in data}
+
+    jobs, timings = [], {}
+    for number, filename, _, _ in CHARTS:
+        if number not in data:
+            continue
+        path = os.path.join(output_dir, filename)
+        if manifest.get(filename) == keys[number] and os.path.exists(path):
+            timings[number] = None
+        else:
+            jobs.append((number, data[number], path))
+
+    workers = min(default_workers() if workers is None else workers, len(jobs))
+    if workers <= 1:
+        if jobs:
+            setup_matplotlib()
+        results = [_render(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=setup_matplotlib,
+                                 initargs=(BATCH_BACKEND,)) as pool:
+            results = list(pool.map(_render, *zip(*jobs)))
+    timings.update({number: (wall, cpu) for number, wall, cpu in results})
+
+    if jobs:
+        for number, filename, _, _ in CHARTS:
+            if number in keys:
+                manifest[filename] = keys[number]
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return timings
@@ -0,0 +1,259 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# VERİ KAYNAKLARI VE SABİTLER
+# ============================================================
+BASKET_FILE = 'basket_details.csv'
+CUSTOMER_FILE = 'customer_details.csv'
+
+# Müşteri verisindeki sex kolonunu temizleme haritası
+REPLACE_MAP = {
+    'kvkktalepsilindi': 'Diğer',
+    'UNKNOWN': 'Diğer'
+}
+
+AGE_BINS = [0, 25, 35, 45, 55, 100]
+AGE_LABELS = ['18-25', '26-35', '36-45', '46-55', '55+']
+
+TENURE_BINS = [0, 60, 90, 120, 150]
+TENURE_LABELS = ['Yeni (0-60)', 'Orta (61-90)', 'Sadık (91-120)', 'Çok Sadık (120+)']
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_LABELS_TR = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
+
+# ============================================================
+# YÜKLEME ŞEMASI
+# ============================================================
+# Varsayılan int64/float64/object tipleri yerine kompakt tipler; tarih okuma
+# sırasında bilinen formatla çözülür.
+BASKET_DTYPES = {
+    'customer_id': 'int32',
+    'product_id': 'int32',
+    # İşaretli: negatif adetler okunurken sarmalanmasın, temizlikte atılabilsin
+    'basket_count': 'int16',
+}
+BASKET_DATE_FORMAT = '%Y-%m-%d'
+
+# customer_age negatif/aşırı değerler ve (birleştirme sonrası) NaN içerebildiği
+# için uint8 yerine float32 tutulur.
+CUSTOMER_DTYPES = {
+    'customer_id': 'int32',
+    'sex': 'category',
+    'customer_age': 'float32',
+    'tenure': 'uint16',
+}
+
+# Birleştirmeden sonra eklenen türetilmiş kolonlar
+FEATURE_COLUMNS = ['year', 'month', 'day_of_week', 'week', 'age_group', 'tenure_group']
+
+
+# ============================================================
+# YÜKLEME VE TEMİZLEME
+# ============================================================
+
+def read_basket(path=BASKET_FILE, chunksize=None, compact=True):
+    """Sepet dosyasını okur; chunksize verilirse parça parça okuyan bir iterator döner.
+
+    compact=False pandas'ın varsayılan tipleriyle okur (bellek raporu için).
+    path bir glob deseni, bölüm dosyaları ya da kolon deposu içeren bir klasör
+    veya girdi.open_basket'in döndürdüğü bir kaynak da olabilir (bkz. girdi.py,
+    kolon_deposu.py); tipler CSV okumasıyla aynıdır.
+    """
+    path = resolve_basket(path)
+    if hasattr(path, 'read_frames'):
+        return path.read_frames(chunksize)
+    if not compact:
+        return pd.read_csv(path, encoding='utf-8', chunksize=chunksize)
+    return pd.read_csv(path, encoding='utf-8', chunksize=chunksize, dtype=BASKET_DTYPES,
+                       parse_dates=['basket_date'], date_format=BASKET_DATE_FORMAT)
+
+
+def resolve_basket(path):
+    """Klasör/glob yolunu girdi.open_basket kaynağına çevirir; diğerleri olduğu gibi döner."""
+    if isinstance(path, (str, os.PathLike)) and (os.path.isdir(path) or glob.has_magic(os.fspath(path))):
+        from girdi import open_basket  # girdi bu modülü içe aktarır
+        return open_basket(path)
+    return path
+
+
+def read_customers(path=CUSTOMER_FILE, compact=True):
+    if not compact:
+        return pd.read_csv(path, encoding='utf-8')
+    return pd.read_csv(path, encoding='utf-8', dtype=CUSTOMER_DTYPES)
+
+
+def parse_basket_dates(df_basket):
+    # Tarih kolonunu datetime'a çevir (kompakt okumada zaten çözülmüş olur)
+    if not pd.api.types.is_datetime64_any_dtype(df_basket['basket_date']):
+        df_basket['basket_date'] = pd.to_datetime(df_basket['basket_date'])
+    return df_basket
+
+
+def replace_values(series, mapping):
+    """Değer eşlemesi; kategorik kolonlarda satırlar yerine kategori kodları üzerinde çalışır."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.replace(mapping)
+    mapped = pd.Index([mapping.get(c, c) for c in series.cat.categories])
+    categories = mapped.unique().sort_values()
+    lookup = categories.get_indexer(mapped)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, lookup[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name)
+
+
+def clean_customers(df_customer, rules=None):
+    """Müşteri tablosunu kurallarla temizler (varsayılan: cinsiyet eşlemesi ve
+    100 üstü yaşlara medyan; bkz. temizlik.py)."""
+    from temizlik import DEFAULT_PROFILE, PROFILES, Cleaner  # temizlik bu modülü içe aktarır
+    return Cleaner(PROFILES[DEFAULT_PROFILE]['customer'] if rules is None else rules).clean(df_customer)
+
+
+class CustomerIndex:
+    """customer_details için customer_id'ye göre sıralı, tekrar kullanılabilir arama indeksi.
+
+    Müşteri tablosu bir boyut (dimension) tablosudur; indeks bir kez kurulur ve
+    sepet satırları vektörel searchsorted/take ile zenginleştirilir. Sonuç
+    pd.merge(..., how='left') ile aynı kolonları üretir; eksik kalabilen tamsayı
+    kolonlar float64 yerine nullable tipte (UInt16, Int64...) tutulur. Aynı
+    customer_id birden çok kez geçerse ilk kayıt kullanılır (duplicates).
+    """
+
+    def __init__(self, df_customer, key='customer_id'):
+        ids = df_customer[key].to_numpy()
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        first = np.ones(len(sorted_ids), dtype=bool)
+        first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+
+        self.key = key
+        self.ids = sorted_ids[first]
+        self.duplicates = int(len(ids) - len(self.ids))
+        rows = order[first]
+        self.columns = {c: df_customer[c].array.take(rows) for c in df_customer.columns if c != key}
+        self.reset_stats()
+
+    @classmethod
+    def from_arrays(cls, ids, columns, key='customer_id', duplicates=0):
+        """Sıralı eşsiz kimlikler ve onlarla hizalı kolon dizilerinden indeks kurar.
+
+        Diziler kopyalanmaz; örneğin paylaşımlı bellek üzerindeki görünümler
+        (bkz. paralel.py) doğrudan kullanılabilir.
+        """
+        index = cls.__new__(cls)
+        index.key = key
+        index.ids = ids
+        index.duplicates = duplicates
+        index.columns = dict(columns)
+        index.reset_stats()
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def reset_stats(self):
+        self.unmatched_rows = 0
+        self.unmatched_ids = self.ids[:0]
+
+    @property
+    def unmatched_customers(self):
+        """Sepette görülen ama müşteri tablosunda bulunmayan eşsiz müşteri sayısı."""
+        return len(self.unmatched_ids)
+
+    def positions(self, customer_ids):
+        """Her kimlik için indeks satırı; bulunamayanlar -1."""
+        customer_ids = np.asarray(customer_ids)
+        if len(self.ids) == 0:
+            return np.full(len(customer_ids), -1, dtype=np.intp)
+        pos = np.searchsorted(self.ids, customer_ids)
+        pos[pos == len(self.ids)] = 0
+        return np.where(self.ids[pos] == customer_ids, pos, -1)
+
+    def enrich(self, df_basket, columns=None):
+        """Sepet satırlarına müşteri kolonlarını ekler (sol birleştirme).
+
+        columns verilirse yalnızca o rapor için gereken kolonlar çekilir.
+        Eşleşmeyen satır ve müşteri sayıları indeks üzerinde birikir.
+        """
+        customer_ids = df_basket[self.key].to_numpy()
+        pos = self.positions(customer_ids)
+        unmatched = pos < 0
+        if unmatched.any():
+            self.unmatched_rows += int(unmatched.sum())
+            self.unmatched_ids = np.union1d(self.unmatched_ids, customer_ids[unmatched])
+
+        columns = list(self.columns) if columns is None else columns
+        values = {c: _take_filled(self.columns[c], pos) for c in columns}
+        return df_basket.assign(**values)
+
+
+def _take_filled(array, pos):
+    """take(..., allow_fill=True): -1 konumları eksik değer olur.
+
+    Tamsayı kolonlar float64'e yükseltilmek yerine aynı genişlikte nullable tipe
+    (uint16 → UInt16) çevrilir; tip, parçada eşleşmeyen satır olup olmamasından
+    bağımsızdır. Kategorik ve float kolonlar kendi eksik değerini tutar.
+    """
+    if isinstance(array, pd.arrays.NumpyExtensionArray):
+        array = array.to_numpy()
+    if not (isinstance(array, np.ndarray) and array.dtype.kind in 'iu'):
+        return pd.api.extensions.take(array, pos, allow_fill=True)
+    # -1 konumu son satırı okur; o değerler maskeyle eksik sayılır
+    values = array.take(pos) if len(array) else np.zeros(len(pos), dtype=array.dtype)
+    return pd.arrays.IntegerArray(values, pos < 0)
+
+
+def load_merged(basket_path=BASKET_FILE, customer_path=CUSTOMER_FILE, compact=True, profile=None):
+    """İki kaynağı okur, profile göre temizler ve birleştirir (türetilmiş özellikler eklenmeden).
+
+    basket_path read_basket'in kabul ettiği her kaynak olabilir. Kolon deposu ve
+    bölüm dosyaları hep kompakt tiplerle okunur; compact=False ise tamsayı
+    kolonlar CSV okumasındaki gibi int64'e çevrilir.
+    """
+    from temizlik import DEFAULT_PROFILE, cleaners  # temizlik bu modülü içe aktarır
+    customer_cleaner, basket_cleaner = cleaners(profile or DEFAULT_PROFILE)
+    df_basket = parse_basket_dates(read_basket(basket_path, compact=compact))
+    if not compact:
+        df_basket = df_basket.astype({c: 'int64' for c in df_basket.columns if df_basket[c].dtype.kind in 'iu'})
+    customer_index = CustomerIndex(customer_cleaner.clean(read_customers(customer_path, compact=compact)))
+    return customer_index.enrich(basket_cleaner.clean(df_basket, customer_index))
+
+
+def memory_report(df_default, df_compact):
+    """Varsayılan ve kompakt şemayla yüklenen tabloların kolon bazında bellek kullanımı (MB).
+
+    Raporlanan tablolar add_features'tan geçmiş olmalıdır; türetilmiş kolonlar
+    (day_of_week, age_group, tenure_group...) da tabloda yer kaplar.
+    """
+    report = pd.DataFrame({
+        'Varsayılan (MB)': df_default.memory_usage(deep=True, index=False) / 1e6,
+        'Kompakt (MB)': df_compact.memory_usage(deep=True, index=False) / 1e6,
+    })
+    report.loc['TOPLAM'] = report.sum()
+    report['Kazanç (x)'] = report['Varsayılan (MB)'] / report['Kompakt (MB)']
+    return report
+
+
+def add_features(df_merge):
+    # Zaman bazlı özellikler
+    df_merge['year'] = df_merge['basket_date'].dt.year.astype('int16')
+    df_merge['month'] = df_merge['basket_date'].dt.month.astype('int8')
+    df_merge['day_of_week'] = pd.Categorical(df_merge['basket_date'].dt.day_name(), categories=DAY_ORDER)
+    df_merge['week'] = df_merge['basket_date'].dt.isocalendar().week.astype('uint8')
+
+    # Yaş grupları
+    df_merge['age_group'] = pd.cut(df_merge['customer_age'],
+                                   bins=AGE_BINS,
+                                   labels=AGE_LABELS,
+                                   ordered=True)
+
+    # Sadakat (tenure) grupları
+    df_merge['tenure_group'] = tenure_groups(df_merge['tenure'])
+    return df_merge
+
+
+def tenure_groups(tenure):
+    return pd.cut(tenure, bins=TENURE_BINS, labels=TENURE_LABELS)
@@ -0,0 +1,317 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import BASKET_DTYPES, BASKET_FILE, read_basket
+from onbellek import CACHE_DIR
+
+# ============================================================
+# SEPET KOLON DEPOSU (MEMORY-MAPPED)
+# ============================================================
+# Sepet geçmişi her kolon için ayrı, sabit genişlikli bir ikili dosyada tutulur:
+#
+#   <depo>/sema.json          küçük başlık: sürüm, satır sayısı, kolon tipleri, gün aralığı
+#   <depo>/customer_id.bin    int32
+#   <depo>/product_id.bin     int32
+#   <depo>/basket_date.bin    int32, 1970-01-01'den beri gün numarası
+#   <depo>/basket_count.bin   int16
+#
+# Satırlar güne göre sıralı yazılır (gün içinde dosyadaki sırayla). Okuma
+# np.memmap ile yapılır: yalnızca istenen kolonların, istenen gün aralığının
+# sayfaları diskten okunur ve kopya oluşmaz; tarih aralığının satır sınırları
+# gün kolonunda ikili aramayla bulunur. Yeni günler dosyaların sonuna eklenir.
+#
+# sema.json her yazımın en sonunda atomik olarak değiştirilir; yarım kalan bir
+# ekleme dosyalarda fazladan bayt bıraksa bile depo son tutarlı hâliyle açılır.
+
+STORE_DIR = os.path.join(CACHE_DIR, 'sepet_kolonlari')
+SCHEMA_FILE = 'sema.json'
+STORE_VERSION = 2
+# Sıralama geçişinde bir seferde yerleştirilen satır sayısı
+WRITE_BLOCK = 1 << 20
+
+STORE_DTYPES = {
+    'customer_id': np.dtype(BASKET_DTYPES['customer_id']),
+    'product_id': np.dtype(BASKET_DTYPES['product_id']),
+    'basket_date': np.dtype('int32'),
+    'basket_count': np.dtype(BASKET_DTYPES['basket_count']),
+}
+# read_basket ile aynı tarih tipi
+DATE_DTYPE = 'datetime64[us]'
+
+
+def is_store(path):
+    return isinstance(path, (str, os.PathLike)) and os.path.isfile(os.path.join(path, SCHEMA_FILE))
+
+
+def _to_days(dates):
+    return dates.to_numpy().astype('datetime64[D]').astype(np.int32)
+
+
+def _to_dates(days):
+    return pd.Series(days.astype('datetime64[D]').astype(DATE_DTYPE))
+
+
+def _day(value):
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+
+class BasketStore:
+    """Memory-mapped sepet kolon deposu; yeni depo create(), ekleme append() ile yapılır.
+
+    rows() ve between() aynı dosyaları paylaşan, bir satır/gün aralığıyla
+    sınırlı görünümler döner. Görünümler read_basket'e (dolayısıyla
+    SalesAnalysis, akış ve paralel toplamaya) CSV yolu yerine verilebilir.
+    """
+
+    # Satırlar güne göre sıralı okunur; akışta biten günler temizlik hafızasından bırakılır
+    day_ordered = True
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, SCHEMA_FILE), encoding='utf-8') as f:
+            self.schema = json.load(f)
+        if self.schema.get('version') != STORE_VERSION:
+            raise ValueError(f"Desteklenmeyen depo sürümü: {self.schema.get('version')} ({path})")
+        self._columns = {}
+        self._lo, self._hi = 0, self.schema['rows']
+
+    @classmethod
+    def create(cls, path=STORE_DIR, csv_path=BASKET_FILE, chunksize=1_000_000):
+        """CSV'yi parça parça okuyup yeni bir depo yazar (varsa üzerine)."""
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        for name in STORE_DTYPES:
+            open(os.path.join(path, f'{name}.bin'), 'wb').close()
+        _write_schema(path, {'version': STORE_VERSION, 'rows': 0, 'first_day': None, 'last_day': None,
+                             'columns': {name: dtype.str for name, dtype in STORE_DTYPES.items()}})
+        store = cls(path)
+        store.append(csv_path, chunksize)
+        return store
+
+    # --- Okuma ---
+
+    def __len__(self):
+        return self._hi - self._lo
+
+    def _view(self, lo, hi):
+        view = object.__new__(type(self))
+        view.path, view.schema, view._columns = self.path, self.schema, self._columns
+        view._lo, view._hi = lo, hi
+        return view
+
+    def _memmap(self, name):
+        """Kolonun depodaki tüm satırları (kopyasız)."""
+        if name not in self._columns:
+            rows = self.schema['rows']
+            dtype = STORE_DTYPES[name]
+            if rows == 0:
+                self._columns[name] = np.empty(0, dtype=dtype)
+            else:
+                self._columns[name] = np.memmap(os.path.join(self.path, f'{name}.bin'), dtype=dtype,
+                                                mode='r', shape=(rows,))
+        return self._columns[name]
+
+    def column(self, name):
+        """Görünümdeki satırlar için kolon dizisi (basket_date gün numarası; kopyasız)."""
+        return self._memmap(name)[self._lo:self._hi]
+
+    def rows(self, start, end):
+        """Görünüm içindeki [start, end) satır aralığı."""
+        start, end = max(0, start), min(len(self), end)
+        return self._view(self._lo + start, self._lo + max(start, end))
+
+    def between(self, start=None, end=None):
+        """start ve end günleri (dahil) arasındaki satırlar; satır sınırları ikili aramayla bulunur."""
+        days = self.column('basket_date')
+        lo = 0 if start is None else int(np.searchsorted(days, _day(start), side='left'))
+        hi = len(days) if end is None else int(np.searchsorted(days, _day(end), side='right'))
+        return self.rows(lo, hi)
+
+    @property
+    def date_range(self):
+        if len(self) == 0:
+            return None, None
+        days = self.column('basket_date')
+        return tuple(pd.Timestamp(np.datetime64(int(d), 'D')) for d in (days[0], days[-1]))
+
+    def frame(self, columns=None):
+        """Görünümü DataFrame olarak döner; sayısal kolonlar memmap üzerindeki görünümlerdir,
+        yalnızca basket_date gün numarasından tarihe çevrilirken kopyalanır."""
+        columns = list(STORE_DTYPES) if columns is None else columns
+        data = {}
+        for name in columns:
+            values = self.column(name)
+            data[name] = _to_dates(values) if name == 'basket_date' else values
+        return pd.DataFrame(data, copy=False)
+
+    def read_frames(self, chunksize=None, columns=None):
+        """read_basket ile aynı sözleşme: chunksize yoksa tek tablo, varsa parça iterator'ı."""
+        if not chunksize:
+            return self.frame(columns)
+        return (self.rows(start, start + chunksize).frame(columns) for start in range(0, len(self), chunksize))
+
+    def row_ranges(self, parts, by_day=False):
+        """Görünümü paralel toplama için en fazla parts adet eşit satır aralığına böler.
+
+        Aralıklar depodaki mutlak satır numaralarıdır; BasketStore(path).rows()
+        ile başka bir süreçte yeniden açılabilir. by_day=True ise sınırlar gün
+        başlarına çekilir ve her günün satırları tek bir aralıkta kalır.
+        """
+        offsets = sorted({len(self) * i // parts for i in range(parts + 1)})
+        if by_day and len(self):
+            days = self.column('basket_date')
+            offsets = sorted({int(np.searchsorted(days, days[o], side='left')) if o < len(days) else o
+                              for o in offsets})
+        return [(self._lo + lo, self._lo + hi) for lo, hi in zip(offsets[:-1], offsets[1:])]
+
+    @property
+    def nbytes(self):
+        return sum(len(self) * dtype.itemsize for dtype in STORE_DTYPES.values())
+
+    # --- Yazma ---
+
+    def append(self, csv_path, chunksize=1_000_000):
+        """CSV'deki, depodaki son günden sonraki satırları ekler; (eklenen, atlanan) döner.
+
+        Artımlı toplamadaki watermark gibi, son günü ve öncesini içeren satırlar
+        zaten depoda sayılır ve atlanır.
+        """
+        last_day = self.schema['last_day']
+        skipped = 0
+
+        def new_rows():
+            nonlocal skipped
+            for chunk in read_basket(csv_path, chunksize=chunksize):
+                days = _to_days(chunk['basket_date'])
+                if last_day is not None:
+                    keep = days > last_day
+                    skipped += int(len(days) - keep.sum())
+                    chunk, days = chunk[keep], days[keep]
+                yield chunk, days
+
+        added = self._write_sorted(new_rows())
+        return added, skipped
+
+    def _write_sorted(self, chunks):
+        """Parçaları iki geçişli sayma sıralamasıyla (counting sort) gün sırasına dizip
+        depo sonuna yazar. Bellekte yalnızca bir parça ve gün başına sayaç tutulur."""
+        rows = self.schema['rows']
+        tmp_dir = os.path.join(self.path, 'yazim.tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            # 1. geçiş: parçalar geçici kolon dosyalarına, gün frekansları sayaca
+            day_counts = pd.Series(dtype='int64')
+            added = 0
+            files = {name: open(os.path.join(tmp_dir, f'{name}.bin'), 'wb') for name in STORE_DTYPES}
+            try:
+                for chunk, days in chunks:
+                    if len(days) == 0:
+                        continue
+                    for name, dtype in STORE_DTYPES.items():
+                        values = days if name == 'basket_date' else chunk[name].to_numpy()
+                        files[name].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                    day_counts = day_counts.add(pd.Series(days).value_counts(), fill_value=0)
+                    added += len(days)
+            finally:
+                for f in files.values():
+                    f.close()
+            if added == 0:
+                return 0
+
+            # 2. geçiş: her satır kendi gününün bir sonraki boş konumuna yazılır
+            day_counts = day_counts.sort_index().astype('int64')
+            first_day = int(day_counts.index[0])
+            cursor = np.zeros(int(day_counts.index[-1]) - first_day + 1, dtype=np.int64)
+            cursor[day_counts.index.to_numpy(dtype=np.int64) - first_day] = (
+                rows + np.concatenate([[0], np.cumsum(day_counts.to_numpy())[:-1]]))
+
+            targets = {}
+            for name, dtype in STORE_DTYPES.items():
+                path = os.path.join(self.path, f'{name}.bin')
+                with open(path, 'r+b') as f:
+                    f.truncate((rows + added) * dtype.itemsize)  # Yarım kalmış yazımların artığı silinir
+                targets[name] = np.memmap(path, dtype=dtype, mode='r+', offset=rows * dtype.itemsize,
+                                          shape=(added,))
+            sources = {name: np.memmap(os.path.join(tmp_dir, f'{name}.bin'), dtype=dtype, mode='r',
+                                       shape=(added,)) for name, dtype in STORE_DTYPES.items()}
+            for start in range(0, added, WRITE_BLOCK):
+                days = np.asarray(sources['basket_date'][start:start + WRITE_BLOCK])
+                order = np.argsort(days, kind='stable')
+                sorted_days = days[order] - first_day
+                new_group = np.empty(len(days), dtype=bool)
+                new_group[0] = True
+                np.not_equal(sorted_days[1:], sorted_days[:-1], out=new_group[1:])
+                group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(days)), 0))
+                positions = np.empty(len(days), dtype=np.int64)
+                positions[order] = cursor[sorted_days] + (np.arange(len(days)) - group_start) - rows
+                np.add.at(cursor, sorted_days[new_group], np.diff(np.append(np.flatnonzero(new_group), len(days))))
+                for name in STORE_DTYPES:
+                    targets[name][positions] = sources[name][start:start + WRITE_BLOCK]
+            for target in targets.values():
+                target.flush()
+            del targets, sources
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        schema = dict(self.schema, rows=rows + added, last_day=int(day_counts.index[-1]))
+        if schema['first_day'] is None:
+            schema['first_day'] = first_day
+        _write_schema(self.path, schema)
+        self.schema, self._columns = schema, {}
+        self._lo, self._hi = 0, schema['rows']
+        return added
+
+
+def _write_schema(path, schema):
+    target = os.path.join(path, SCHEMA_FILE)
+    with open(target + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2)
+    os.replace(target + '.tmp', target)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sepet geçmişi için memory-mapped kolon deposu')
+    parser.add_argument('--depo', default=STORE_DIR, help=f'Depo klasörü (varsayılan: {STORE_DIR})')
+    parser.add_argument('--donustur', metavar='CSV', nargs='?', const=BASKET_FILE,
+                        help='CSV\'den yeni depo yaz (varsa üzerine; varsayılan: basket_details.csv)')
+    parser.add_argument('--ekle', metavar='CSV', help='Depodaki son günden sonraki günleri ekle')
+    parser.add_argument('--parca-boyutu', type=int, default=1_000_000, help='CSV okuma parça boyutu (satır)')
+    parser.add_argument('--olc', metavar='CSV', nargs='?', const=BASKET_FILE,
+                        help='CSV okuma ile depodan okumanın süresini karşılaştır')
+    args = parser.parse_args()
+
+    if args.donustur:
+        start = time.perf_counter()
+        store = BasketStore.create(args.depo, args.donustur, args.parca_boyutu)
+        print(f"💾 {len(store):,} satır yazıldı → {args.depo} ({time.perf_counter() - start:.2f} sn)")
+    if args.ekle:
+        store = BasketStore(args.depo)
+        added, skipped = store.append(args.ekle, args.parca_boyutu)
+        print(f"➕ {added:,} satır eklendi, {skipped:,} satır son günden eski olduğu için atlandı")
+
+    store = BasketStore(args.depo)
+    first, last = store.date_range
+    print(f"📦 {args.depo}: {len(store):,} satır, {store.nbytes / 1e6:.1f} MB, "
+          f"{first.date() if first is not None else '-'} - {last.date() if last is not None else '-'}")
+
+    if args.olc:
+        start = time.perf_counter()
+        csv_frame = read_basket(args.olc)
+        csv_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        store_frame = BasketStore(args.depo).frame()
+        store_seconds = time.perf_counter() - start
+        print(f"⏱️  CSV okuma: {csv_seconds:.3f} sn, depodan okuma: {store_seconds:.3f} sn "
+              f"({csv_seconds / max(store_seconds, 1e-9):.0f}x)")
+        start = time.perf_counter()
+        week = BasketStore(args.depo).between(last - pd.Timedelta(days=6), last)
+        total = int(week.column('basket_count').sum())
+        print(f"   Son 7 gün ({len(week):,} satır) basket_count toplamı: {total:,} "
+              f"({(time.perf_counter() - start) * 1e3:.2f} ms, yalnızca iki kolon okunur)")
@@ -0,0 +1,340 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from en_cok_satan import top_k
+from hazirlik import DAY_ORDER
+from onbellek import CACHE_DIR
+from toplama import PartialSums
+
+# ============================================================
+# ÖN TOPLANMIŞ SATIŞ KÜPÜ
+# ============================================================
+# Tarih × ürün × cinsiyet × yaş grubu × sadakat grubu üzerinde sum/count.
+# Haftanın günü tarihten türetildiği için küpte ayrı bir anahtar değildir,
+# ancak sorgularda diğer boyutlar gibi filtre/gruplama için kullanılabilir.
+CUBE_KEYS = ['basket_date', 'product_id', 'sex', 'age_group', 'tenure_group']
+DIMENSIONS = CUBE_KEYS + ['day_of_week']
+CATEGORICAL_DIMENSIONS = ['sex', 'age_group', 'tenure_group', 'day_of_week']
+
+CUBE_FILE = os.path.join(CACHE_DIR, 'satis_kupu.npz')
+
+# Sorgu parametrelerinin Türkçe adları (sunucu ve komut satırı)
+QUERY_PARAMS = {
+    'cinsiyet': 'sex',
+    'yas': 'age_group',
+    'sadakat': 'tenure_group',
+    'gun': 'day_of_week',
+    'urun': 'product_id',
+}
+
+# Gruplama anahtar uzayı bu boyutu aşmıyorsa bincount, aşıyorsa np.unique kullanılır
+_BINCOUNT_LIMIT = 1 << 22
+
+
+class SalesCube:
+    """Filtreli rollup sorgularını ham tabloyu yeniden gruplamadan yanıtlayan küp.
+
+    Parçalar update() ile SalesAggregator'daki gibi toplanır. İlk sorguda küp
+    kolonsal, kompakt bir forma çevrilir: her boyut için küçük bir etiket
+    tablosu ve satır başına tamsayı kodları (NaN = -1). Satırlar tarihe göre
+    sıralı olduğundan tarih aralığı bir dilimdir; diğer filtreler kodlar
+    üzerinde vektörel maske, gruplama bincount ile yapılır. Ürüne bakmayan
+    sorgular ürün boyutu toplanmış daha küçük bir küpten yanıtlanır.
+    """
+
+    def __init__(self):
+        self._cube = None
+        self.labels = None
+        self.codes = None
+        self.sums = None
+        self.counts = None
+        self._segment = None
+
+    def __len__(self):
+        self._compact()
+        return len(self.sums)
+
+    def update(self, df):
+        """Özellikleri eklenmiş birleştirilmiş bir parçayı küpe ekler."""
+        if len(df) == 0:
+            return self
+        if self._cube is None:
+            self._cube = PartialSums(levels=list(range(len(CUBE_KEYS))))
+            if self.codes is not None:
+                self._cube.add(self._as_frame())
+        part = df.groupby(CUBE_KEYS, dropna=False, observed=True)['basket_count'].agg(['sum', 'count'])
+        self._cube.add(part.astype('int64'))
+        self.codes = None
+        self._segment = None
+        return self
+
+    # --- Kompakt form ---
+
+    def _compact(self):
+        if self.codes is not None:
+            return
+        if self._cube is None:
+            raise ValueError('Küp boş: önce update() ile veri eklenmeli')
+        cube = self._cube.result()
+        index = cube.index
+        dates = index.get_level_values('basket_date')
+        unique_dates = dates.unique().sort_values()
+        products, product_codes = np.unique(index.get_level_values('product_id').to_numpy(), return_inverse=True)
+        date_codes = unique_dates.get_indexer(dates).astype(np.int32)
+
+        self.labels = {'basket_date': unique_dates, 'product_id': pd.Index(products, name='product_id'),
+                       'day_of_week': pd.Index(DAY_ORDER)}
+        self.codes = {'basket_date': date_codes, 'product_id': product_codes.astype(np.int32),
+                      'day_of_week': unique_dates.dayofweek.to_numpy().astype(np.int8)[date_codes]}
+        for dim in ['sex', 'age_group', 'tenure_group']:
+            values = index.get_level_values(dim)
+            self.labels[dim] = values.categories
+            self.codes[dim] = values.codes.astype(np.int8)
+        self.sums = cube['sum'].to_numpy()
+        self.counts = cube['count'].to_numpy()
+        self._cube = None
+        self._segment_table()
+
+    def _level(self, dim, codes):
+        labels = self.labels[dim]
+        if dim in CATEGORICAL_DIMENSIONS:
+            ordered = dim in ('age_group', 'tenure_group')  # pd.cut sıralı kategori üretir
+            return pd.CategoricalIndex(pd.Categorical.from_codes(codes, categories=labels, ordered=ordered),
+                                       name=dim)
+        return labels.take(codes).rename(dim)
+
+    def _as_frame(self):
+        index = pd.MultiIndex.from_arrays([self._level(dim, self.codes[dim]) for dim in CUBE_KEYS])
+        return pd.DataFrame({'sum': self.sums, 'count': self.counts}, index=index)
+
+    @property
+    def nbytes(self):
+        self._compact()
+        return (sum(c.nbytes for c in self.codes.values()) + self.sums.nbytes + self.counts.nbytes
+                + sum(labels.memory_usage(deep=True) for labels in self.labels.values()))
+
+    # --- Sorgular ---
+
+    def _wanted_codes(self, dim, values):
+        if isinstance(values, (str, int, np.integer, pd.Timestamp)):
+            values = [values]
+        if dim == 'product_id':
+            values = pd.Index(np.asarray(values, dtype=np.int64))
+        elif dim == 'basket_date':
+            values = pd.DatetimeIndex(pd.to_datetime(values))
+        else:
+            values = pd.Index([str(v) for v in values])
+        wanted = self.labels[dim].get_indexer(values)
+        return wanted[wanted >= 0]
+
+    def _segment_table(self):
+        """Ürün boyutu toplanmış küçük küp; ürüne bakmayan sorgular bunu kullanır."""
+        if self._segment is None:
+            dims = ['basket_date', 'sex', 'age_group', 'tenure_group']
+            sizes = [len(self.labels[dim]) + 1 for dim in dims]  # +1: NaN (-1) kodu için
+            keys = np.ravel_multi_index([self.codes[dim] + 1 for dim in dims], sizes)
+            groups, inverse = np.unique(keys, return_inverse=True)
+            codes = {dim: (c - 1).astype(self.codes[dim].dtype)
+                     for dim, c in zip(dims, np.unravel_index(groups, sizes))}
+            codes['day_of_week'] = self.labels['basket_date'].dayofweek.to_numpy().astype(np.int8)[
+                codes['basket_date']]
+            self._segment = (codes, np.bincount(inverse, weights=self.sums).astype(np.int64),
+                             np.bincount(inverse, weights=self.counts).astype(np.int64))
+        return self._segment
+
+    def _select(self, by, start, end, filters):
+        """Sorguya uygun tabloyu seçer; tarih aralığı dilimi ve filtre maskesini uygular."""
+        self._compact()
+        for dim in list(by) + list(filters):
+            if dim not in DIMENSIONS:
+                raise KeyError(f"Bilinmeyen boyut: {dim} (geçerli: {', '.join(DIMENSIONS)})")
+        if 'product_id' in by or filters.get('product_id') is not None:
+            codes, sums, counts = self.codes, self.sums, self.counts
+        else:
+            codes, sums, counts = self._segment_table()
+
+        # Satırlar basket_date'e göre sıralı; tarih aralığı maske yerine dilimle seçilir
+        dates = self.labels['basket_date']
+        low = dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        high = dates.searchsorted(pd.Timestamp(end), side='right') if end is not None else len(dates)
+        rows = slice(*np.searchsorted(codes['basket_date'], [low, high]))
+        codes = {dim: c[rows] for dim, c in codes.items()}
+        sums, counts = sums[rows], counts[rows]
+
+        mask = None
+        for dim, values in filters.items():
+            if values is not None:
+                matched = np.isin(codes[dim], self._wanted_codes(dim, values))
+                mask = matched if mask is None else mask & matched
+        for dim in by:
+            present = codes[dim] >= 0
+            mask = present if mask is None else mask & present
+        if mask is not None:
+            codes = {dim: c[mask] for dim, c in codes.items()}
+            sums, counts = sums[mask], counts[mask]
+        return codes, sums, counts
+
+    def query(self, by=None, start=None, end=None, **filters):
+        """Filtrelenmiş küpü by boyutlarına indirger; sum/count kolonlu tablo döner.
+
+        start/end tarih aralığıdır (iki uç dahil); diğer filtreler boyut adıyla
+        tek değer veya liste olarak verilir (örn. sex='Female',
+        age_group=['26-35', '36-45'], day_of_week='Monday'). Sonuç,
+        ham tablo üzerinde groupby(by, observed=True) ile aynıdır: gruplama
+        boyutunda NaN olan satırlar düşer, gruplar artan sıradadır.
+        by verilmezse toplamlar Series olarak döner.
+        """
+        by = [] if by is None else [by] if isinstance(by, str) else list(by)
+        codes, sums, counts = self._select(by, start, end, filters)
+        if not by:
+            return pd.Series({'sum': int(sums.sum()), 'count': int(counts.sum())})
+
+        sizes = [len(self.labels[dim]) for dim in by]
+        keys = np.ravel_multi_index([codes[dim] for dim in by], sizes)
+        if np.prod(sizes, dtype=np.float64) <= _BINCOUNT_LIMIT:
+            group_sums = np.bincount(keys, weights=sums, minlength=int(np.prod(sizes)))
+            group_counts = np.bincount(keys, weights=counts, minlength=int(np.prod(sizes)))
+            groups = np.flatnonzero(group_counts)
+            group_sums, group_counts = group_sums[groups], group_counts[groups]
+        else:
+            groups, inverse = np.unique(keys, return_inverse=True)
+            group_sums = np.bincount(inverse, weights=sums)
+            group_counts = np.bincount(inverse, weights=counts)
+
+        levels = [self._level(dim, c) for dim, c in zip(by, np.unravel_index(groups, sizes))]
+        index = levels[0] if len(levels) == 1 else pd.MultiIndex.from_arrays(levels)
+        return pd.DataFrame({'sum': group_sums.astype(np.int64), 'count': group_counts.astype(np.int64)},
+                            index=index)
+
+    def top_products(self, n=10, start=None, end=None, **filters):
+        """Filtrelenmiş dilimde en çok satan n ürün (rapordaki sıralamayla)."""
+        return top_k(self.query('product_id', start=start, end=end, **filters), n)
+
+    # --- Kalıcı saklama ---
+
+    def save(self, path=CUBE_FILE):
+        """Kompakt küpü sıkıştırılmış .npz olarak yazar (pickle kullanılmaz)."""
+        self._compact()
+        arrays = {f'codes_{dim}': codes for dim, codes in self.codes.items()}
+        arrays['labels_basket_date'] = self.labels['basket_date'].to_numpy().astype('datetime64[ns]')
+        arrays['labels_product_id'] = self.labels['product_id'].to_numpy()
+        for dim in ['sex', 'age_group', 'tenure_group']:
+            arrays[f'labels_{dim}'] = np.asarray(self.labels[dim], dtype=str)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            np.savez_compressed(f, sums=self.sums, counts=self.counts, **arrays)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path=CUBE_FILE):
+        cube = cls()
+        with np.load(path) as data:
+            cube.sums, cube.counts = data['sums'], data['counts']
+            cube.codes = {dim: data[f'codes_{dim}'] for dim in DIMENSIONS}
+            cube.labels = {'basket_date': pd.DatetimeIndex(data['labels_basket_date']),
+                           'product_id': pd.Index(data['labels_product_id'], name='product_id'),
+                           'day_of_week': pd.Index(DAY_ORDER)}
+            for dim in ['sex', 'age_group', 'tenure_group']:
+                cube.labels[dim] = pd.Index(data[f'labels_{dim}'].tolist())
+        return cube
+
+
+# ============================================================
+# HAM YOL VE ÇAPRAZ KONTROL
+# ============================================================
+
+def raw_rollup(df_merge, by=None, start=None, end=None, **filters):
+    """SalesCube.query ile aynı sorguyu birleştirilmiş tablo üzerinde groupby ile hesaplar."""
+    mask = pd.Series(True, index=df_merge.index)
+    if start is not None:
+        mask &= df_merge['basket_date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df_merge['basket_date'] <= pd.Timestamp(end)
+    for dim, values in filters.items():
+        if values is None:
+            continue
+        if isinstance(values, (str, int, np.integer, pd.Timestamp)):
+            values = [values]
+        if dim == 'basket_date':
+            values = pd.to_datetime(values)
+        elif dim == 'product_id':
+            values = np.asarray(values, dtype=np.int64)
+        mask &= df_merge[dim].isin(values)
+    selected = df_merge.loc[mask.to_numpy(), 'basket_count']
+    if by is None:
+        return pd.Series({'sum': int(selected.sum()), 'count': int(selected.count())})
+    keys = [by] if isinstance(by, str) else list(by)
+    grouped = df_merge.loc[mask.to_numpy(), keys + ['basket_count']].groupby(keys, observed=True)
+    return grouped['basket_count'].agg(['sum', 'count']).astype('int64')
+
+
+def cross_check(cube, df_merge, by=None, **filters):
+    """Küp ve ham yol sonuçlarını karşılaştırır; farklıysa AssertionError fırlatır."""
+    expected = raw_rollup(df_merge, by=by, **filters)
+    actual = cube.query(by=by, **filters)
+    if by is None:
+        pd.testing.assert_series_equal(actual, expected)
+        return actual
+    # Kategorik kategori listeleri (gözlenmeyenler dahil) farklı olabilir; değerler karşılaştırılır
+    pd.testing.assert_frame_equal(actual, expected, check_index_type=False, check_categorical=False)
+    return actual
+
+
+def parse_query_params(params):
+    """Türkçe sorgu parametrelerini ('yas=26-35,36-45') SalesCube.query argümanlarına çevirir."""
+    kwargs = {}
+    for name, dim in QUERY_PARAMS.items():
+        if params.get(name):
+            kwargs[dim] = params[name].split(',')
+    if params.get('baslangic'):
+        kwargs['start'] = params['baslangic']
+    if params.get('bitis'):
+        kwargs['end'] = params['bitis']
+    if params.get('grup'):
+        kwargs['by'] = [QUERY_PARAMS.get(d, d) for d in params['grup'].split(',')]
+    return kwargs
+
+
+if __name__ == '__main__':
+    from satis_analizi import SalesAnalysis
+
+    parser = argparse.ArgumentParser(description='Ön toplanmış küp üzerinden filtreli satış sorgusu')
+    parser.add_argument('--grup', help="Gruplama boyutları, virgülle (örn. urun veya cinsiyet,yas)")
+    parser.add_argument('--baslangic', help='Başlangıç tarihi (dahil), örn. 2019-06-13')
+    parser.add_argument('--bitis', help='Bitiş tarihi (dahil)')
+    for name, dim in QUERY_PARAMS.items():
+        parser.add_argument(f'--{name}', help=f'{dim} filtresi (virgülle birden çok değer)')
+    parser.add_argument('--n', type=int, default=10, help='Gösterilecek en yüksek satışlı grup sayısı')
+    parser.add_argument('--dogrula', action='store_true', help='Sonucu ham groupby yolu ile karşılaştır')
+    parser.add_argument('--kaydet', action='store_true', help=f'Küpü {CUBE_FILE} dosyasına yaz')
+    args = parser.parse_args()
+    query = parse_query_params(vars(args))
+
+    analysis = SalesAnalysis()
+    merged = analysis.merged
+    start = time.perf_counter()
+    cube = analysis.cube
+    len(cube)
+    print(f"🧊 Küp kuruldu: {len(merged):,} satır → {len(cube):,} küp satırı, "
+          f"{cube.nbytes / 1e6:.2f} MB ({time.perf_counter() - start:.3f} sn)")
+    if args.kaydet:
+        cube.save()
+        print(f"💾 Küp kaydedildi: {CUBE_FILE} ({os.path.getsize(CUBE_FILE) / 1e6:.2f} MB)")
+
+    start = time.perf_counter()
+    result = cube.query(**query)
+    cube_ms = (time.perf_counter() - start) * 1e3
+    if 'by' in query:
+        result = top_k(result, args.n)
+    print(result)
+    print(f"\n⚡ Küp sorgusu: {cube_ms:.2f} ms")
+    if args.dogrula:
+        start = time.perf_counter()
+        raw_rollup(merged, **query)
+        raw_ms = (time.perf_counter() - start) * 1e3
+        cross_check(cube, merged, **query)
+        print(f"✓ Ham yol ile aynı sonuç (ham groupby: {raw_ms:.2f} ms, {raw_ms / max(cube_ms, 1e-9):.1f}x)")
@@ -0,0 +1,129 @@
+import cProfile
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ============================================================
+# AŞAMA ÖLÇÜMÜ (PROFİL)
+# ============================================================
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek RSS değeri (MB); desteklenmiyorsa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt döner
+    return peak / (1e6 if platform.system() == 'Darwin' else 1e3)
+
+
+class Profiler:
+    """Aşama ve alt adımların duvar/CPU süresini ve bellek tepe değerlerini kaydeder.
+
+    Aşamalar iç içe açılabilir; kayıt adı üst aşamalarla '/' ile birleştirilir
+    (örn. 'asama2/gender_sales'). trace_memory=True ise tracemalloc ile aşama
+    başına Python bellek tepe değeri de ölçülür. cprofile_stage adı verilen
+    aşama cProfile altında çalıştırılır ve istatistikleri .prof dosyasına yazılır.
+    """
+
+    def __init__(self, trace_memory=False, cprofile_stage=None, cprofile_path=None):
+        self.trace_memory = trace_memory
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_path = cprofile_path or f'cprofile_{(cprofile_stage or "").replace("/", "_")}.prof'
+        self.records = []
+        self._stack = []
+        self._cprofile = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self, name):
+        full_name = '/'.join([frame['stage'] for frame in self._stack] + [name])
+        if self.trace_memory:
+            # Üst aşamanın o ana kadarki tepe değeri saklanır, sonra sayaç sıfırlanır
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if full_name == self.cprofile_stage:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._stack.append({'stage': name, 'full_name': full_name, 'peak': 0,
+                            'start': time.perf_counter(), 'cpu_start': time.process_time()})
+
+    def stop(self, name):
+        frame = self._stack.pop()
+        if frame['stage'] != name:
+            raise RuntimeError(f"Aşama sırası bozuk: '{frame['stage']}' beklenirken '{name}' kapatıldı")
+        record = {
+            'stage': frame['full_name'],
+            'seconds': time.perf_counter() - frame['start'],
+            'cpu_seconds': time.process_time() - frame['cpu_start'],
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        if self.trace_memory:
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            record['tracemalloc_peak_mb'] = peak / 1e6
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+        if self._cprofile is not None and frame['full_name'] == self.cprofile_stage:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+        self.records.append(record)
+        return record
+
+    @contextmanager
+    def stage(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def record(self, name, seconds, cpu_seconds):
+        """Başka bir süreçte ölçülmüş bir adımı (örn. paralel grafik) kayda ekler."""
+        full_name = '/'.join([frame['stage'] for frame in self._stack] + [name])
+        self.records.append({'stage': full_name, 'seconds': seconds,
+                             'cpu_seconds': cpu_seconds, 'peak_rss_mb': None})
+
+    def to_dict(self, **meta):
+        return {
+            'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'),
+                     'python': platform.python_version(), 'platform': platform.platform(),
+                     'cpu_count': os.cpu_count(), **meta},
+            'stages': self.records,
+        }
+
+    def save(self, path, **meta):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(**meta), f, ensure_ascii=False, indent=2)
+
+    def summary_table(self, baseline=None):
+        """Kayıtları hizalı bir metin tablosu olarak döner; baseline verilirse oranlar eklenir."""
+        base = {r['stage']: r for r in baseline['stages']} if baseline else {}
+        header = f"{'Aşama':<45} {'Süre (sn)':>10} {'CPU (sn)':>10} {'RSS (MB)':>10}"
+        if self.trace_memory:
+            header += f" {'Py tepe (MB)':>13}"
+        if base:
+            header += f" {'Önceki':>10} {'Oran':>7}"
+        lines = [header]
+        for r in self.records:
+            rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+            line = f"{r['stage']:<45} {r['seconds']:>10.3f} {r['cpu_seconds']:>10.3f} {rss:>10}"
+            if self.trace_memory:
+                traced = r.get('tracemalloc_peak_mb')
+                line += f" {traced:>13.1f}" if traced is not None else f" {'-':>13}"
+            if r['stage'] in base:
+                previous = base[r['stage']]['seconds']
+                line += f" {previous:>10.3f} {r['seconds'] / max(previous, 1e-9):>6.2f}x"
+            lines.append(line)
+        return '\n'.join(lines)
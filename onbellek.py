@@ -0,0 +1,90 @@
+import hashlib
+import importlib.util
+import json
+import os
+import time
+
+import pandas as pd
+
+# ============================================================
+# KOLONSAL ÖNBELLEK (FEATHER)
+# ============================================================
+CACHE_DIR = '.onbellek'
+CACHE_VERSION = 4
+
+# İçerik özeti için dosyanın başından ve sonundan okunan bayt sayısı
+HASH_BLOCK = 1 << 20
+
+
+def cache_available():
+    """Feather okuma/yazma için isteğe bağlı pyarrow paketi kurulu mu?"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _file_fingerprint(path):
+    """Dosyanın boyutu, değişiklik zamanı ve baş/son bloklarının özeti.
+
+    Klasörlerde (örn. kolon deposu) içindeki dosyaların parmak izleri birleştirilir.
+    """
+    if os.path.isdir(path):
+        return {'path': os.path.basename(path),
+                'files': [_file_fingerprint(os.path.join(path, name)) for name in sorted(os.listdir(path))]}
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(HASH_BLOCK))
+        if stat.st_size > HASH_BLOCK:
+            f.seek(max(stat.st_size - HASH_BLOCK, HASH_BLOCK))
+            digest.update(f.read(HASH_BLOCK))
+    return {'path': os.path.basename(path), 'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def source_key(paths, **options):
+    """Kaynak dosyaların parmak izinden (ve varsa tarih aralığı gibi
+    seçeneklerden) önbellek anahtarı üretir."""
+    fingerprints = [_file_fingerprint(p) for p in paths]
+    content = {'version': CACHE_VERSION, 'sources': fingerprints}
+    options = {name: str(value) for name, value in options.items() if value is not None}
+    if options:
+        content['options'] = options
+    payload = json.dumps(content, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _paths(key, cache_dir):
+    base = os.path.join(cache_dir, f'df_merge_{key}')
+    return base + '.feather', base + '.json'
+
+
+def load_cached(key, cache_dir=CACHE_DIR):
+    """Önbellekte varsa (df_merge, meta) döner, yoksa (None, None)."""
+    data_path, meta_path = _paths(key, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    start = time.perf_counter()
+    df_merge = pd.read_feather(data_path)
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['warm_seconds'] = time.perf_counter() - start
+    return df_merge, meta
+
+
+def save_cached(key, df_merge, meta, cache_dir=CACHE_DIR):
+    """Temizlenmiş ve birleştirilmiş tabloyu (yükleme şemasındaki tiplerle) önbelleğe yazar.
+
+    Aynı klasördeki eski anahtarlara ait dosyalar silinir; önbellekte her zaman
+    yalnızca güncel kaynaklara ait tek bir kopya bulunur.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _paths(key, cache_dir)
+    for name in os.listdir(cache_dir):
+        if name.startswith('df_merge_') and key not in name:
+            os.remove(os.path.join(cache_dir, name))
+
+    # Yarım kalan bir yazım sonraki çalıştırmada geçerli önbellek sanılmasın
+    df_merge.to_feather(data_path + '.tmp')
+    os.replace(data_path + '.tmp', data_path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return df_merge
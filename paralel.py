@@ -0,0 +1,293 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import BASKET_FILE, CUSTOMER_FILE, CustomerIndex, clean_customers, read_customers
+from girdi import BasketSources, open_basket, partition_date
+from kolon_deposu import BasketStore
+from tekil_sayim import sorted_unique
+from toplama import SalesAggregator, aggregate_stream
+
+# ============================================================
+# ÇOK ÇEKİRDEKLİ (PARALEL) TOPLAMA
+# ============================================================
+# Sepet dosyası satır sınırlarına hizalanmış bayt aralıklarına (kolon deposunda
+# satır aralıklarına, çok dosyalı girdide dosyalara) bölünür; her bölüm bir
+# süreçte okunur, müşteri indeksiyle zenginleştirilir ve kendi
+# SalesAggregator'ına toplanır. Ana süreç yalnızca kısmi toplamları birleştirir
+# (SalesAggregator.merge); sepet satırları süreçler arasında hiç taşınmaz.
+#
+# Müşteri indeksinin dizileri bir kez paylaşımlı belleğe (shared_memory)
+# kopyalanır; işçiler onları kopyalamadan görünüm olarak kullanır, böylece
+# müşteri boyutu her göreve pickle ile gönderilmez.
+
+# Bir bölümün hedef boyutu; büyük dosyalarda işçi sayısından fazla bölüm
+# oluşur, böylece işçi belleği sınırlı kalır ve yük dengelenir.
+PARTITION_BYTES = 32 * 1024 * 1024
+# İşçinin kendi bölümünü okurken kullandığı parça boyutu (satır)
+PARTITION_CHUNKSIZE = 100_000
+
+# İşçi süreçteki müşteri indeksi ve paylaşımlı bellek blokları (initializer doldurur)
+_worker_index = None
+_worker_blocks = []
+
+
+def available_cpus():
+    return os.cpu_count() or 1
+
+
+def byte_ranges(path, parts):
+    """Dosyayı başlık satırından sonra en fazla parts adet, satır sınırında biten
+    (başlangıç, bitiş) bayt aralığına böler."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header_end = len(f.readline())
+        bounds = [header_end]
+        for i in range(1, parts):
+            target = header_end + (size - header_end) * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # Bulunulan satırın sonuna ilerle
+            position = f.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+# ============================================================
+# MÜŞTERİ İNDEKSİNİ PAYLAŞMA
+# ============================================================
+
+def _share(array, blocks):
+    """Diziyi yeni bir paylaşımlı bellek bloğuna kopyalar; (ad, dtype, şekil) döner."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    blocks.append(block)
+    return block.name, array.dtype.str, array.shape
+
+
+def _attach(spec, blocks):
+    name, dtype, shape = spec
+    block = shared_memory.SharedMemory(name=name)
+    blocks.append(block)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def share_customer_index(index):
+    """İndeks dizilerini paylaşımlı belleğe koyar; (işçiye gönderilecek tanım, bloklar) döner.
+
+    Bloklar iş bitince close() ve unlink() ile serbest bırakılmalıdır.
+    """
+    blocks = []
+    columns = {}
+    for name, values in index.columns.items():
+        if isinstance(values, pd.Categorical):
+            columns[name] = ('category', _share(values.codes, blocks), values.dtype)
+        else:
+            columns[name] = ('array', _share(np.asarray(values), blocks), None)
+    spec = {'key': index.key, 'duplicates': index.duplicates,
+            'ids': _share(index.ids, blocks), 'columns': columns}
+    return spec, blocks
+
+
+def attach_customer_index(spec, blocks):
+    """share_customer_index tanımından kopyasız bir CustomerIndex kurar."""
+    columns = {}
+    for name, (kind, array_spec, dtype) in spec['columns'].items():
+        values = _attach(array_spec, blocks)
+        if kind == 'category':
+            columns[name] = pd.Categorical.from_codes(values, dtype=dtype)
+        else:
+            columns[name] = pd.arrays.NumpyExtensionArray(values)
+    return CustomerIndex.from_arrays(_attach(spec['ids'], blocks), columns,
+                                     key=spec['key'], duplicates=spec['duplicates'])
+
+
+def _init_worker(spec):
+    global _worker_index
+    _worker_index = attach_customer_index(spec, _worker_blocks)
+
+
+# ============================================================
+# BÖLÜM TOPLAMA
+# ============================================================
+
+def partitions(basket, workers, partition_bytes=PARTITION_BYTES, together=None):
+    """Sepet kaynağını işçilere gönderilecek bölüm tanımlarına böler.
+
+    Tanımlar yalnızca yol ve sayılardan oluşur: ('csv', yol, ilk bayt, son bayt),
+    ('store', depo yolu, ilk satır, son satır) veya ('file', yol(lar), ilk gün, son gün).
+    together='day' ise aynı günün satırları aynı bölümde kalır: depo gün
+    sınırlarından, dosyalar adlarındaki güne göre bölünür; gün sırası
+    bilinmeyen CSV ve tarihsiz dosyalar tek bölüm olur. together='all' ise
+    tüm kaynak tek bölümdür (bkz. partition_grouping).
+    """
+    if isinstance(basket, (str, os.PathLike)):
+        basket = open_basket(basket)
+    if isinstance(basket, BasketStore):
+        # Her işçi depo dosyalarını kendisi map'ler
+        parts = 1 if together == 'all' else max(workers, -(-basket.nbytes // partition_bytes))
+        return [('store', basket.path, lo, hi) for lo, hi in basket.row_ranges(parts, by_day=together == 'day')]
+    if isinstance(basket, BasketSources):
+        if together is None:
+            return [('file', path, basket.start, basket.end) for path in basket.paths]
+        days = [partition_date(path) for path in basket.paths]
+        if together == 'all' or None in days:
+            return [('file', basket.paths, basket.start, basket.end)] if basket.paths else []
+        by_day = {}
+        for day, path in zip(days, basket.paths):
+            by_day.setdefault(day, []).append(path)
+        return [('file', paths, basket.start, basket.end) for paths in by_day.values()]
+    if together is not None:
+        return [('csv', basket, start, end) for start, end in byte_ranges(basket, 1)]
+    parts = max(workers, -(-os.path.getsize(basket) // partition_bytes))
+    return [('csv', basket, start, end) for start, end in byte_ranges(basket, parts)]
+
+
+def partition_grouping(cleaner):
+    """Sepet kurallarının bölümlemeye getirdiği kısıt: None, 'day' veya 'all'.
+
+    Tekrar kuralı bir satırı önceki parçalarda görülen satırlarla karşılaştırır;
+    sonuç tek süreçli toplamayla aynı olsun diye eşit satırlar aynı bölüme düşmelidir.
+    """
+    keys = cleaner.partition_keys if cleaner is not None else set()
+    if not keys:
+        return None
+    return 'day' if keys == {'basket_date'} else 'all'
+
+
+def _partition_source(partition):
+    kind, path, start, end = partition
+    if kind == 'store':
+        return BasketStore(path).rows(start, end)
+    if kind == 'file':
+        return BasketSources(path, start=start, end=end, workers=1)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        return io.BytesIO(header + f.read(end - start))
+
+
+def aggregate_partition(customer_index, partition, chunksize=PARTITION_CHUNKSIZE, after=None, cleaner=None,
+                        rfm=False):
+    """Tek bir bölümü (bkz. partitions) toplar.
+
+    (aggregator, eşleşmeyen satır sayısı, eşleşmeyen kimlikler, cleaner) döner;
+    sayaçlar indeks üzerinde birikmesin diye her bölümden önce sıfırlanır,
+    temizlik sayaçları bölümün kendi Cleaner kopyasında tutulur.
+    """
+    source = _partition_source(partition)
+    customer_index.reset_stats()
+    cleaner = cleaner.spawn() if cleaner is not None else None
+    aggregator = aggregate_stream(customer_index, source, chunksize, aggregator=SalesAggregator(rfm=rfm),
+                                  after=after, cleaner=cleaner)
+    return aggregator, customer_index.unmatched_rows, customer_index.unmatched_ids, cleaner
+
+
+def _aggregate_in_worker(partition, chunksize, after, cleaner, rfm):
+    return aggregate_partition(_worker_index, partition, chunksize, after, cleaner, rfm)
+
+
+def aggregate_parallel(customer_index, basket_path, workers=None, aggregator=None,
+                       chunksize=PARTITION_CHUNKSIZE, partition_bytes=PARTITION_BYTES, cleaner=None, rfm=False):
+    """Sepet kaynağını workers süreçte bölümleyerek toplar (bkz. aggregate_stream).
+
+    basket_path bir CSV, kolon deposu, glob/klasör ya da girdi.open_basket
+    sonucu olabilir.
+
+    Sonuç tek süreçli toplamayla birebir aynıdır. Verilen aggregator'a yalnızca
+    watermark'tan sonraki günler eklenir; eşleşmeyen müşteri sayaçları
+    customer_index üzerinde, sıralı yoldaki gibi birikir. cleaner verilirse sepet
+    kuralları her bölümde uygulanır ve kural sayaçları ona eklenir. Tekrar
+    kuralı varsa bölümler partition_grouping'e göre ayrılır; gün sırası
+    bilinmeyen bir CSV bu durumda tek süreçte toplanır. rfm yeni aggregator'ın
+    müşteri durumunu da tutup tutmayacağıdır; verilen aggregator'ın ayarı korunur.
+    """
+    aggregator = SalesAggregator(rfm=rfm) if aggregator is None else aggregator
+    workers = workers or available_cpus()
+    parts = partitions(basket_path, workers, partition_bytes, together=partition_grouping(cleaner))
+    after = aggregator.watermark
+
+    unmatched_rows, unmatched_ids = customer_index.unmatched_rows, [customer_index.unmatched_ids]
+    if workers == 1 or len(parts) == 1:
+        partials = [aggregate_partition(customer_index, part, chunksize, after, cleaner, aggregator.rfm)
+                    for part in parts]
+    else:
+        spec, blocks = share_customer_index(customer_index)
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(parts)),
+                                     initializer=_init_worker, initargs=(spec,)) as pool:
+                partials = list(pool.map(_aggregate_in_worker, parts, [chunksize] * len(parts),
+                                         [after] * len(parts), [cleaner] * len(parts),
+                                         [aggregator.rfm] * len(parts)))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    for partial, rows, ids, partial_cleaner in partials:
+        aggregator.merge(partial)
+        if cleaner is not None:
+            cleaner.merge(partial_cleaner)
+        unmatched_rows += rows
+        unmatched_ids.append(ids)
+    customer_index.unmatched_rows = unmatched_rows
+    customer_index.unmatched_ids = sorted_unique(np.concatenate(unmatched_ids))
+    return aggregator
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _summary_tables(summary):
+    return {name: value for name, value in vars(summary).items() if isinstance(value, (pd.DataFrame, pd.Series))}
+
+
+def run_benchmark(data_dir, worker_counts, chunksize=PARTITION_CHUNKSIZE):
+    """Sıralı akış toplamasını farklı işçi sayılarıyla paralel toplamayla karşılaştırır."""
+    basket_path = os.path.join(data_dir, BASKET_FILE)
+    customers = clean_customers(read_customers(os.path.join(data_dir, CUSTOMER_FILE)))
+
+    start = time.perf_counter()
+    expected = aggregate_stream(CustomerIndex(customers), basket_path, chunksize).result()
+    serial = time.perf_counter() - start
+    print(f"{'İşçi':>5} {'Süre (sn)':>10} {'Hızlanma':>9} {'Tablolar':>9}")
+    print(f"{'sıralı':>5} {serial:>10.2f} {1:>8.2f}x {'-':>9}")
+
+    for workers in worker_counts:
+        index = CustomerIndex(customers)
+        start = time.perf_counter()
+        summary = aggregate_parallel(index, basket_path, workers, chunksize=chunksize).result()
+        seconds = time.perf_counter() - start
+        same = all(table.equals(_summary_tables(expected)[name])
+                   for name, table in _summary_tables(summary).items())
+        print(f"{workers:>5} {seconds:>10.2f} {serial / seconds:>8.2f}x {'aynı' if same else 'FARKLI':>9}")
+
+
+if __name__ == '__main__':
+    from sentetik_veri import generate
+
+    parser = argparse.ArgumentParser(description='Paralel toplama benchmark\'ı')
+    parser.add_argument('--satir', type=float, default=1e6, help='Sentetik sepet satırı sayısı')
+    parser.add_argument('--veri-dizini', help='Sentetik veri yerine bu klasördeki CSV dosyaları')
+    parser.add_argument('--isci', type=int, nargs='+', default=[1, 2, 4, available_cpus()],
+                        help='Denenecek işçi sayıları (varsayılan: 1 2 4 ve çekirdek sayısı)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.veri_dizini or tmp
+        if not args.veri_dizini:
+            print(f"🧪 {int(args.satir):,} satırlık sentetik veri üretiliyor...")
+            generate(data_dir, int(args.satir))
+        print(f"🖥️  {available_cpus()} çekirdek\n")
+        run_benchmark(data_dir, sorted(set(args.isci)))
@@ -0,0 +1,290 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import BASKET_FILE, parse_basket_dates, read_basket
+
+# ============================================================
+# MÜŞTERİ DÜZEYİNDE RFM VE HAFTALIK KOHORT
+# ============================================================
+# CustomerStats her müşteri için ilk/son basket_date, sipariş (sepet satırı)
+# sayısı ve toplam basket_count tutar; ayrıca (müşteri, hafta) etkinlik
+# çiftlerini saklar. Bir parça tek bir sıralamayla işlenir: satırlar
+# müşteri × hafta anahtarına göre sıralanınca müşteri grupları da bitişik
+# olur, müşteri toplamları reduceat ile, etkinlik çiftleri komşu farkıyla
+# çıkarılır.
+#
+# Parçaların kısmi sonuçları bekleyen listede tutulur ve bekleyen satır sayısı
+# birleştirilmiş durumu aşınca tek seferde birleştirilir; böylece her parça
+# tüm müşteri dizisini yeniden kopyalamaz. Durum toplanabilir olduğundan
+# merge() ile başka bölümlerin sonuçları eklenebilir; artımlı modda yeni
+# günler update() ile eklenir.
+#
+# Haftalar add_features'taki week (ISO hafta) kolonuyla aynı Pazartesi
+# başlangıçlı haftalardır; yıl sınırında sıralı kalsınlar diye gün
+# numarasından türetilir (1970-01-01 Perşembedir, (gün + 3) // 7).
+
+# Müşteri × hafta anahtarında hafta numarasına ayrılan bit sayısı
+WEEK_BITS = 16
+# Bekleyen kısmi sonuçlar en az bu kadar müşteri satırına ulaşınca birleştirilir
+COMPACT_MIN = 1 << 20
+# RFM skorlarının dilim sayısı (1..RFM_BINS)
+RFM_BINS = 5
+
+
+def _days(dates):
+    return np.asarray(dates).astype('datetime64[D]').astype(np.int64)
+
+
+def _week(days):
+    return (days + 3) // 7
+
+
+def _week_start(weeks):
+    """Hafta numarasının Pazartesi tarihi."""
+    return pd.to_datetime(weeks * 7 - 3, unit='D')
+
+
+class CustomerStats:
+    """Müşteri başına ilk/son gün, sipariş ve adet toplamı; haftalık etkinlik çiftleri."""
+
+    def __init__(self):
+        # Her biri (ids, first, last, orders, items) — ids sıralı ve eşsiz
+        self._parts = []
+        self._pairs = []
+        self._pending = 0
+        self._size = 0
+
+    def update(self, df):
+        """customer_id, basket_date ve basket_count kolonlu bir parçayı ekler."""
+        if len(df) == 0:
+            return self
+        ids = df['customer_id'].to_numpy().astype(np.int64)
+        days = _days(df['basket_date'].to_numpy())
+        counts = df['basket_count'].to_numpy()
+
+        keys = (ids << WEEK_BITS) + _week(days)
+        order = np.argsort(keys)
+        keys, ids, days, counts = keys[order], ids[order], days[order], counts[order]
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        self._add((ids[starts],
+                   np.minimum.reduceat(days, starts),
+                   np.maximum.reduceat(days, starts),
+                   np.diff(np.append(starts, len(ids))),
+                   np.add.reduceat(counts.astype(np.int64), starts)),
+                  keys[np.concatenate([[True], keys[1:] != keys[:-1]])])
+        return self
+
+    def merge(self, other):
+        """Başka bir parçada veya süreçte doldurulmuş durumu ekler."""
+        for part, pairs in zip(other._parts, other._pairs):
+            self._add(part, pairs)
+        return self
+
+    def _add(self, part, pairs):
+        self._parts.append(part)
+        self._pairs.append(pairs)
+        self._pending += len(part[0])
+        if self._pending > max(self._size, COMPACT_MIN):
+            self._compact()
+
+    def _compact(self):
+        if len(self._parts) > 1:
+            ids, first, last, orders, items = (np.concatenate(column) for column in zip(*self._parts))
+            # Parçalar zaten sıralı; kararlı sıralama bu dizileri birleştirir (quicksort'tan hızlı)
+            order = np.argsort(ids, kind='stable')
+            ids = ids[order]
+            starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+            self._parts = [(ids[starts],
+                            np.minimum.reduceat(first[order], starts),
+                            np.maximum.reduceat(last[order], starts),
+                            np.add.reduceat(orders[order], starts),
+                            np.add.reduceat(items[order], starts))]
+            pairs = np.sort(np.concatenate(self._pairs), kind='stable')
+            self._pairs = [pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]]
+        self._size = len(self._parts[0][0]) if self._parts else 0
+        self._pending = 0
+
+    def _state(self):
+        self._compact()
+        if not self._parts:
+            empty = np.array([], dtype=np.int64)
+            return (empty,) * 5, empty
+        return self._parts[0], self._pairs[0]
+
+    def __len__(self):
+        return len(self._state()[0][0])
+
+    @property
+    def nbytes(self):
+        (part, pairs) = self._state()
+        return sum(a.nbytes for a in part) + pairs.nbytes
+
+    # --- Sonuçlar ---
+
+    def customers(self):
+        """customer_id indeksli first_date, last_date, orders, items tablosu."""
+        (ids, first, last, orders, items), _ = self._state()
+        return pd.DataFrame({
+            'first_date': pd.to_datetime(first, unit='D'),
+            'last_date': pd.to_datetime(last, unit='D'),
+            'orders': orders,
+            'items': items,
+        }, index=pd.Index(ids, name='customer_id'))
+
+    def rfm(self, reference=None, bins=RFM_BINS):
+        """Müşteri başına recency (gün), frequency (sipariş), volume (adet) ve 1..bins skorları.
+
+        reference verilmezse en son sepet gününün ertesi gün alınır. Skorlar
+        yüzdelik sıralamayla verilir (eşit değerler aynı skoru alır); R için
+        yakın tarih, F ve M için büyük değer yüksek skordur.
+        """
+        table = self.customers()
+        if reference is None:
+            reference = table['last_date'].max() + pd.Timedelta(days=1)
+        table['recency'] = (pd.Timestamp(reference) - table['last_date']).dt.days.astype('int32')
+
+        def score(values, ascending=True):
+            pct = values.rank(method='min', pct=True, ascending=ascending)
+            return np.ceil(pct * bins).clip(1, bins).astype('uint8')
+
+        table['R'] = score(table['recency'], ascending=False)
+        table['F'] = score(table['orders'])
+        table['M'] = score(table['items'])
+        return table
+
+    def cohorts(self):
+        """Kohort haftası × hafta farkı başına etkin eşsiz müşteri sayısı.
+
+        Satırlar müşterinin ilk alışveriş haftasının Pazartesi tarihi, kolonlar
+        o haftadan bu yana geçen hafta sayısıdır (0 = kohort haftası).
+        """
+        (ids, first, _, _, _), pairs = self._state()
+        if len(pairs) == 0:
+            return pd.DataFrame()
+        pair_weeks = pairs & ((1 << WEEK_BITS) - 1)
+        cohort = _week(first)[np.searchsorted(ids, pairs >> WEEK_BITS)]
+        offset = pair_weeks - cohort
+        low, span = cohort.min(), int(offset.max()) + 1
+        counts = np.bincount((cohort - low) * span + offset, minlength=(cohort.max() - low + 1) * span)
+        table = pd.DataFrame(counts.reshape(-1, span),
+                             index=pd.DatetimeIndex(_week_start(np.arange(low, cohort.max() + 1)), name='cohort'),
+                             columns=pd.RangeIndex(span, name='week_offset'))
+        return table[table[0] > 0]
+
+    def retention(self):
+        """Kohort başına elde tutma oranı (%); 0. hafta her zaman 100'dür."""
+        counts = self.cohorts()
+        return counts.div(counts[0], axis=0) * 100
+
+
+def customer_stats(basket_path=BASKET_FILE, chunksize=None, stats=None, after=None):
+    """Sepet kaynağından CustomerStats kurar; verilen stats'a yalnızca after'dan
+    sonraki günler eklenir (artımlı güncelleme)."""
+    stats = CustomerStats() if stats is None else stats
+    frames = read_basket(basket_path, chunksize=chunksize) if chunksize else [read_basket(basket_path)]
+    for frame in frames:
+        frame = parse_basket_dates(frame)
+        if after is not None:
+            frame = frame[frame['basket_date'] > after]
+        stats.update(frame)
+    return stats
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def naive_tables(df):
+    """Aynı tabloların doğrudan groupby ile hesabı (karşılaştırma için)."""
+    grouped = df.groupby('customer_id')
+    customers = pd.DataFrame({
+        'first_date': grouped['basket_date'].min(),
+        'last_date': grouped['basket_date'].max(),
+        'orders': grouped.size(),
+        'items': grouped['basket_count'].sum().astype('int64'),
+    })
+    week = df['basket_date'].dt.to_period('W-SUN').dt.start_time
+    cohort = week.groupby(df['customer_id']).transform('min')
+    offset = ((week - cohort).dt.days // 7).rename('week_offset')
+    cohorts = (df['customer_id'].groupby([cohort.rename('cohort'), offset]).nunique()
+               .unstack(fill_value=0))
+    return customers, cohorts
+
+
+def _same(stats, customers, cohorts):
+    got = stats.customers()
+    return (got.index.equals(customers.index)
+            and all(np.array_equal(got[c].to_numpy(), customers[c].to_numpy()) for c in got.columns)
+            and np.array_equal(stats.cohorts().to_numpy(), cohorts.to_numpy()))
+
+
+def run_benchmark(basket_path, chunksize, new_days=7):
+    df = parse_basket_dates(read_basket(basket_path))
+    print(f"📦 {len(df):,} sepet satırı\n")
+    print(f"{'Yöntem':<40} {'Süre (sn)':>10} {'Sonuç':>7}")
+
+    start = time.perf_counter()
+    customers, cohorts = naive_tables(df)
+    naive = time.perf_counter() - start
+    print(f"{'groupby (tam tablo)':<40} {naive:>10.2f} {'-':>7}")
+
+    start = time.perf_counter()
+    stats = CustomerStats().update(df)
+    stats.cohorts()
+    seconds = time.perf_counter() - start
+    print(f"{'CustomerStats (tek parça)':<40} {seconds:>10.2f} {'aynı' if _same(stats, customers, cohorts) else 'FARKLI':>7}")
+
+    start = time.perf_counter()
+    stats = CustomerStats()
+    for i in range(0, len(df), chunksize):
+        stats.update(df.iloc[i:i + chunksize])
+    stats.cohorts()
+    seconds = time.perf_counter() - start
+    label = f"CustomerStats ({chunksize:,} satırlık parça)"
+    print(f"{label:<40} {seconds:>10.2f} {'aynı' if _same(stats, customers, cohorts) else 'FARKLI':>7}")
+
+    # Artımlı: son new_days gün dışındaki geçmiş hazır, yalnızca yeni günler eklenir
+    cutoff = df['basket_date'].max() - pd.Timedelta(days=new_days)
+    stats = CustomerStats().update(df[df['basket_date'] <= cutoff])
+    stats.cohorts()
+    new = df[df['basket_date'] > cutoff]
+    start = time.perf_counter()
+    stats.update(new)
+    stats.cohorts()
+    seconds = time.perf_counter() - start
+    label = f"artımlı (+{new_days} gün, {len(new):,} satır)"
+    print(f"{label:<40} {seconds:>10.2f} {'aynı' if _same(stats, customers, cohorts) else 'FARKLI':>7}")
+    print(f"\n👥 {len(stats):,} müşteri, durum {stats.nbytes / 1e6:,.1f} MB")
+
+
+if __name__ == '__main__':
+    from sentetik_veri import generate
+
+    parser = argparse.ArgumentParser(description='Müşteri RFM ve haftalık kohort analizi')
+    parser.add_argument('--sepet', help='Sepet kaynağı (CSV, klasör, glob, depo); verilmezse sentetik veri')
+    parser.add_argument('--satir', type=float, default=1e7, help='Sentetik sepet satırı sayısı')
+    parser.add_argument('--gun', type=int, default=91, help='Sentetik verinin gün sayısı')
+    parser.add_argument('--parca-boyutu', type=int, default=1_000_000, help='Parça boyutu (satır)')
+    parser.add_argument('--benchmark', action='store_true', help='groupby ile süre ve sonuç karşılaştırması')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        basket_path = args.sepet
+        if basket_path is None:
+            print(f"🧪 {int(args.satir):,} satırlık sentetik veri üretiliyor...")
+            basket_path, _ = generate(tmp, int(args.satir), days=args.gun)
+        if args.benchmark:
+            run_benchmark(basket_path, args.parca_boyutu)
+        else:
+            stats = customer_stats(basket_path, args.parca_boyutu)
+            rfm = stats.rfm()
+            print(f"👥 {len(rfm):,} müşteri\n")
+            print(rfm[['recency', 'orders', 'items']].describe().round(2))
+            print("\nR × F skor dağılımı (müşteri sayısı):")
+            print(pd.crosstab(rfm['R'], rfm['F']))
+            print("\nHaftalık kohort elde tutma (%):")
+            print(stats.retention().round(1).to_string())
@@ -0,0 +1,222 @@
+import os
+from functools import cached_property
+
+import pandas as pd
+
+import grafikler
+from en_cok_satan import heavy_hitters
+from hazirlik import (BASKET_FILE, CUSTOMER_FILE, CustomerIndex, add_features, parse_basket_dates,
+                      read_basket, read_customers)
+from kup import SalesCube
+from paralel import PARTITION_CHUNKSIZE, aggregate_parallel
+from rfm import CustomerStats
+from tekil_sayim import HLL_PRECISION, distinct_counter
+from temizlik import DEFAULT_PROFILE, cleaners
+from toplama import (SalesAggregator, age_table, aggregate_stream, daily_table, day_of_week_table,
+                     enriched_chunks, gender_table, tenure_table, top_products_table)
+
+# ============================================================
+# İÇE AKTARILABİLİR ANALİZ API'Sİ
+# ============================================================
+# Örnek:
+#   from satis_analizi import SalesAnalysis
+#   analysis = SalesAnalysis('basket_details.csv', 'customer_details.csv')
+#   print(analysis.top_products)        # yalnızca yükleme + toplama çalışır
+#   analysis.render_charts('grafikler/')  # matplotlib ancak burada yüklenir
+
+# Raporun tabloları: ad → SalesAnalysis özelliği
+REPORTS = ['top_products', 'gender_sales', 'age_sales', 'daily_sales', 'day_sales',
+           'tenure_sales', 'gender_age']
+
+
+class SalesAnalysis:
+    """İki kaynaktan (sepet + müşteri) kurulan, tembel (lazy) hesaplanan satış analizi.
+
+    Hiçbir adım nesne oluşturulurken çalışmaz: müşteri indeksi, birleştirilmiş
+    tablo, toplamlar ve her rapor ilk erişildiğinde hesaplanır ve saklanır
+    (memoize). Dönen tablolar paylaşılır; değiştirilecekse kopyalanmalıdır.
+    chunksize verilirse sepet dosyası akış modunda parça parça toplanır ve
+    birleştirilmiş tablo (merged) hiç oluşturulmaz. workers verilirse toplama
+    o kadar süreçte paralel yapılır (bkz. paralel.py). basket_path bir kolon
+    deposu klasörü ya da BasketStore görünümü de olabilir (bkz. kolon_deposu.py).
+    cleaning temizlik kural profilidir (bkz. temizlik.py); kural sayaçları
+    cleaning_report ile alınır.
+    """
+
+    def __init__(self, basket_path=BASKET_FILE, customer_path=CUSTOMER_FILE, chunksize=None, workers=None,
+                 cleaning=DEFAULT_PROFILE):
+        self.basket_path = basket_path
+        self.customer_path = customer_path
+        self.chunksize = chunksize
+        self.workers = workers
+        self.customer_cleaner, self.basket_cleaner = cleaners(cleaning)
+
+    @classmethod
+    def from_aggregator(cls, aggregator, customer_index=None, **kwargs):
+        """Önceden doldurulmuş bir SalesAggregator'dan (akış, artımlı, önbellek) analiz kurar."""
+        analysis = cls(**kwargs)
+        analysis.__dict__['aggregator'] = aggregator
+        if customer_index is not None:
+            analysis.__dict__['customer_index'] = customer_index
+        return analysis
+
+    # --- Hazırlık ---
+
+    @cached_property
+    def customers(self):
+        return self.customer_cleaner.clean(read_customers(self.customer_path))
+
+    @cached_property
+    def customer_index(self):
+        return CustomerIndex(self.customers)
+
+    @cached_property
+    def merged(self):
+        """Temizlenmiş, birleştirilmiş ve özellikleri eklenmiş sepet tablosu."""
+        df_basket = parse_basket_dates(read_basket(self.basket_path))
+        df_basket = self.basket_cleaner.clean(df_basket, self.customer_index)
+        return add_features(self.customer_index.enrich(df_basket))
+
+    @cached_property
+    def aggregator(self):
+        if self.workers:
+            return aggregate_parallel(self.customer_index, self.basket_path, self.workers,
+                                      chunksize=self.chunksize or PARTITION_CHUNKSIZE, cleaner=self.basket_cleaner)
+        if self.chunksize:
+            return aggregate_stream(self.customer_index, self.basket_path, self.chunksize,
+                                    cleaner=self.basket_cleaner)
+        return SalesAggregator().update(self.merged)
+
+    @cached_property
+    def summary(self):
+        return self.aggregator.result()
+
+    @property
+    def cleaning_report(self):
+        """Müşteri ve sepet kurallarının etkilediği satır sayıları (toplamayı tetikler)."""
+        self.aggregator  # Sepet sayaçları toplama sırasında dolar
+        return pd.concat([self.customer_cleaner.report(), self.basket_cleaner.report()])
+
+    def _chunks(self):
+        """Birleştirilmiş veriyi parça parça verir (bellekte tek parça, akış modunda dosyadan).
+
+        Akış modunda dosya yeniden okunur; müşteri eşleşmeme ve temizlik sayaçları iki kez
+        sayılmasın diye geçiş sonunda eski değerlerine döndürülür (temizlik boş bir kopyayla yapılır).
+        """
+        if not self.chunksize:
+            yield self.merged
+            return
+        index = self.customer_index
+        unmatched = index.unmatched_rows, index.unmatched_ids
+        try:
+            yield from enriched_chunks(index, self.basket_path, self.chunksize, cleaner=self.basket_cleaner.spawn())
+        finally:
+            index.unmatched_rows, index.unmatched_ids = unmatched
+
+    @cached_property
+    def cube(self):
+        """Filtreli dilim sorguları için tarih × ürün × segment küpü (bkz. kup.SalesCube)."""
+        cube = SalesCube()
+        for chunk in self._chunks():
+            cube.update(chunk)
+        return cube
+
+    def query(self, by=None, start=None, end=None, **filters):
+        """Tarih aralığı ve segment filtreli rollup (örn. by='product_id', sex='Female')."""
+        return self.cube.query(by=by, start=start, end=end, **filters)
+
+    def distinct(self, column='customer_id', by=None, approximate=False, precision=HLL_PRECISION):
+        """column için eşsiz değer sayısı; by verilirse (örn. 'basket_date', 'age_group') grup başına.
+
+        approximate=True HyperLogLog kullanır (bkz. tekil_sayim); sonuçlar saklanmaz.
+        """
+        counter = distinct_counter(approximate=approximate, by=by, precision=precision)
+        for chunk in self._chunks():
+            if by is None:
+                counter.update(chunk[column].to_numpy())
+            else:
+                counter.update(chunk[by], chunk[column].to_numpy())
+        return counter.count() if by is None else counter.result()
+
+    def heavy_hitters(self, n=10, method='space_saving', capacity=1000):
+        """En çok satan n ürünün sabit bellekli akış tahmini (bkz. en_cok_satan); kesin
+        sonuç için top_products kullanılır. Sonuçlar saklanmaz."""
+        summary = heavy_hitters(method, capacity)
+        for chunk in self._chunks():
+            summary.update(chunk)
+        return summary.result(n)
+
+    # --- Rapor tabloları (AŞAMA 2) ---
+
+    @cached_property
+    def top_products(self):
+        return top_products_table(self.summary)
+
+    @cached_property
+    def gender_sales(self):
+        return gender_table(self.summary)
+
+    @cached_property
+    def age_sales(self):
+        return age_table(self.summary)
+
+    @cached_property
+    def daily_sales(self):
+        return daily_table(self.summary)
+
+    @cached_property
+    def day_sales(self):
+        return day_of_week_table(self.summary)
+
+    @cached_property
+    def tenure_sales(self):
+        return tenure_table(self.summary)
+
+    @cached_property
+    def gender_age(self):
+        return self.summary.gender_age
+
+    @cached_property
+    def customer_stats(self):
+        """Müşteri başına durum (bkz. rfm.CustomerStats). Toplama rfm=True ile yapıldıysa
+        oradan alınır; yapılmadıysa veri bir kez daha taranır."""
+        if self.summary.customer_stats is not None:
+            return self.summary.customer_stats
+        stats = CustomerStats()
+        for chunk in self._chunks():
+            stats.update(chunk)
+        return stats
+
+    @cached_property
+    def rfm(self):
+        """Müşteri başına ilk/son gün, recency, sipariş, adet ve R/F/M skorları (bkz. rfm.py)."""
+        return self.customer_stats.rfm()
+
+    @cached_property
+    def cohort_retention(self):
+        """Haftalık kohort × hafta farkı elde tutma oranları (%)."""
+        return self.customer_stats.retention()
+
+    def report(self, name):
+        """Raporu adıyla döner (bkz. REPORTS)."""
+        if name not in REPORTS:
+            raise KeyError(f"Bilinmeyen rapor: {name} (geçerli: {', '.join(REPORTS)})")
+        return getattr(self, name)
+
+    # --- Grafikler (AŞAMA 3) ---
+
+    @cached_property
+    def chart_data(self):
+        return grafikler.chart_data(self.summary)
+
+    def chart_png(self, number):
+        """Tek bir grafiği PNG baytları olarak döner."""
+        return grafikler.render_png(number, self.chart_data[number])
+
+    def render_charts(self, output_dir='.', workers=None, use_cache=True, numbers=None):
+        """Grafikleri output_dir altına çizer; dönüş değeri grafikler.render_charts ile aynıdır."""
+        data = self.chart_data
+        if numbers is not None:
+            data = {number: data[number] for number in numbers}
+        os.makedirs(output_dir, exist_ok=True)
+        return grafikler.render_charts(data, workers=workers, output_dir=output_dir, use_cache=use_cache)
@@ -0,0 +1,139 @@
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import BASKET_FILE, CUSTOMER_FILE
+
+# ============================================================
+# SENTETİK VERİ ÜRETECİ
+# ============================================================
+# Örnek veriden (15k sepet / 20k müşteri) gözlenen dağılımlar:
+#   - Ürün popülerliği çarpık ve uzun kuyruklu (az sayıda çok satan ürün)
+#   - sex: ~%77 Male, ~%23 Female, az sayıda kvkktalepsilindi/UNKNOWN
+#   - customer_age: çoğunluk 18-60, ancak ~%25'i 100 üstü ve birkaç negatif değer
+#   - tenure: 4-133 gün, sağa çarpık (ortalama ~44)
+#   - basket_count: en az 2, büyük çoğunluğu 2 (ortalama ~2.15)
+#   - Haftanın günlerine göre belirgin fark (Pazartesi yüksek, Perşembe düşük)
+
+SEX_VALUES = np.array(['Male', 'Female', 'kvkktalepsilindi', 'UNKNOWN'])
+SEX_WEIGHTS = [0.7661, 0.23345, 0.0004, 0.00005]
+
+# Pazartesi..Pazar satış ağırlıkları (örnek verideki sipariş sayılarından)
+WEEKDAY_WEIGHTS = [3175, 2732, 1469, 1023, 1667, 2207, 2727]
+
+START_DATE = '2019-05-20'
+ID_BASE = 1_000
+
+
+class _IdSpace:
+    """0..n-1 sıra numaralarını benzersiz, rastgele görünen kimliklere eşler.
+
+    Kimlikler (a*k + b) mod M afin permütasyonuyla hesaplanır; böylece 1e8
+    mertebesinde kimlik için bile dizi tutmadan tekrarsız kimlik üretilir.
+    """
+
+    def __init__(self, n, rng, min_space):
+        self.modulus = max(min_space, 3 * n)
+        self.multiplier = int(rng.integers(self.modulus // 3, self.modulus))
+        while math.gcd(self.multiplier, self.modulus) != 1:
+            self.multiplier += 1
+        self.offset = int(rng.integers(0, self.modulus))
+
+    def ids(self, k):
+        k = np.asarray(k, dtype=np.int64)
+        # a*k çarpımı int64'ü taşırmasın diye a iki parçaya bölünerek hesaplanır
+        a, m = self.multiplier, self.modulus
+        hi, lo = divmod(a, 1 << 20)
+        value = ((k * hi) % m * (1 << 20) + k * lo + self.offset) % m
+        return ID_BASE + value
+
+
+def _zipf_ranks(size, n, skew, rng):
+    """0..n-1 arası Zipf benzeri popülerlik sırası (sürekli yaklaşık ters CDF ile)."""
+    u = rng.random(size)
+    if abs(skew - 1.0) < 1e-9:
+        ranks = np.power(float(n), u)
+    else:
+        e = 1.0 - skew
+        ranks = np.power(u * (n ** e - 1.0) + 1.0, 1.0 / e)
+    return np.clip(ranks.astype(np.int64), 1, n) - 1
+
+
+def _customer_chunk(k, id_space, rng):
+    size = len(k)
+    age = np.clip(rng.normal(38, 10, size=size), 18, 99).round()
+    anomalies = rng.random(size)
+    age = np.where(anomalies < 0.25, rng.integers(101, 2023, size=size), age)
+    age = np.where(anomalies > 0.999, -rng.integers(1, 40, size=size), age)
+    return pd.DataFrame({
+        'customer_id': id_space.ids(k),
+        'sex': SEX_VALUES[rng.choice(len(SEX_VALUES), size=size, p=SEX_WEIGHTS)],
+        'customer_age': age.astype(float),
+        'tenure': np.clip(rng.gamma(2.0, 22.0, size=size).round(), 4, 133).astype(np.int64),
+    })
+
+
+def generate(output_dir, n_rows, n_customers=None, n_products=None, days=31, match_rate=0.8,
+             skew=0.6, seed=42, chunk_rows=1_000_000):
+    """basket_details.csv ve customer_details.csv dosyalarını output_dir altına yazar.
+
+    Her iki dosya da chunk_rows satırlık bloklar halinde yazılır; 1e8 satırlık
+    dosyalar da sabit bellekle üretilebilir. match_rate, sepetteki müşterilerin
+    müşteri tablosunda bulunma oranıdır; skew ürün popülerliğinin çarpıklığıdır.
+    """
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(1, n_rows * 4 // 3)
+    n_products = n_products or max(1, n_rows * 7 // 8)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Bilinen ve bilinmeyen müşteriler aynı kimlik uzayından, ayrık sıra numaralarıyla gelir
+    customer_space = _IdSpace(2 * n_customers, rng, min_space=50_000_000)
+    product_space = _IdSpace(n_products, rng, min_space=56_000_000)
+
+    customer_path = os.path.join(output_dir, CUSTOMER_FILE)
+    for start in range(0, n_customers, chunk_rows):
+        k = np.arange(start, min(start + chunk_rows, n_customers))
+        _customer_chunk(k, customer_space, rng).to_csv(
+            customer_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+    dates = pd.date_range(START_DATE, periods=days, freq='D')
+    day_weights = np.array([WEEKDAY_WEIGHTS[d.weekday()] for d in dates], dtype=float)
+    day_weights /= day_weights.sum()
+
+    basket_path = os.path.join(output_dir, BASKET_FILE)
+    for start in range(0, n_rows, chunk_rows):
+        size = min(chunk_rows, n_rows - start)
+        matched = rng.random(size) < match_rate
+        k = rng.integers(0, n_customers, size=size) + np.where(matched, 0, n_customers)
+        chunk = pd.DataFrame({
+            'customer_id': customer_space.ids(k),
+            'product_id': product_space.ids(_zipf_ranks(size, n_products, skew, rng)),
+            'basket_date': dates[rng.choice(days, size=size, p=day_weights)].strftime('%Y-%m-%d'),
+            'basket_count': 1 + rng.geometric(0.87, size=size),
+        })
+        chunk.to_csv(basket_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return basket_path, customer_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sentetik sepet ve müşteri verisi üretir')
+    parser.add_argument('--satir', type=float, default=1e5, help='Sepet satırı sayısı (örn. 1e6)')
+    parser.add_argument('--musteri', type=float, help='Müşteri sayısı (varsayılan: satır × 4/3)')
+    parser.add_argument('--urun', type=float, help='Ürün katalog büyüklüğü (varsayılan: satır × 7/8)')
+    parser.add_argument('--gun', type=int, default=31, help='Tarih aralığı (gün)')
+    parser.add_argument('--eslesme-orani', type=float, default=0.8,
+                        help='Sepet müşterilerinin müşteri tablosunda bulunma oranı')
+    parser.add_argument('--carpiklik', type=float, default=0.6, help='Ürün popülerliği Zipf üssü')
+    parser.add_argument('--tohum', type=int, default=42, help='Rastgele sayı üreteci tohumu')
+    parser.add_argument('--cikti-dizini', default='sentetik_veri', help='Dosyaların yazılacağı klasör')
+    args = parser.parse_args()
+
+    basket_path, customer_path = generate(
+        args.cikti_dizini, int(args.satir),
+        n_customers=int(args.musteri) if args.musteri else None,
+        n_products=int(args.urun) if args.urun else None,
+        days=args.gun, match_rate=args.eslesme_orani, skew=args.carpiklik, seed=args.tohum)
+    print(f"✅ Sentetik veri üretildi: {basket_path}, {customer_path}")
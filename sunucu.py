@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from grafikler import BATCH_BACKEND, CHARTS
+from en_cok_satan import top_k
+from girdi import source_paths
+from hazirlik import BASKET_FILE, CUSTOMER_FILE
+from kup import parse_query_params
+from onbellek import source_key
+from satis_analizi import REPORTS, SalesAnalysis
+from toplama import top_products_table
+
+# ============================================================
+# RAPOR SUNUCUSU
+# ============================================================
+# Veri bir kez yüklenip bellekte tutulur; raporlar ve grafikler HTTP ile sunulur.
+#
+#   GET  /                      → uç noktaların listesi
+#   GET  /ozet                  → temel istatistikler
+#   GET  /rapor/<ad>            → rapor tablosu (JSON); top_products için ?n=20
+#   GET  /grafik/<numara>.png   → grafik (PNG)
+#   GET  /sorgu                 → küpten filtreli rollup, örn.
+#        ?grup=urun&cinsiyet=Female&yas=26-35&baslangic=2019-06-13&bitis=2019-06-19&n=10
+#   POST /yenile                → CSV'ler değiştiyse veriyi yeniden yükle (?zorla=1 her durumda)
+
+CHART_NUMBERS = {number for number, _, _, _ in CHARTS}
+
+
+class LRUCache:
+    """En son kullanılan maxsize yanıtı tutan, iş parçacığı güvenli önbellek."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _to_json(table):
+    """Rapor tablosunu (DataFrame/Series) kayıt listesi olarak JSON baytlarına çevirir."""
+    frame = table.to_frame() if table.ndim == 1 else table
+    frame = frame.reset_index()
+    frame.columns = [str(c) for c in frame.columns]
+    return frame.to_json(orient='records', date_format='iso', force_ascii=False).encode('utf-8')
+
+
+# Bir yüklemenin değişmez görüntüsü; her istek baştan sona aynı görüntüyle yanıtlanır
+Snapshot = namedtuple('Snapshot', ['source', 'analysis', 'loaded_at', 'load_seconds'])
+
+
+class ReportService:
+    """Bellekteki SalesAnalysis'i ve yanıt önbelleğini yöneten sunucu durumu.
+
+    POST /yenile yeni analizi kilitsiz kurar, yalnızca görüntüyü kilit altında
+    değiştirir; o sırada yanıtlanan istekler eski görüntüyü kullanmaya devam eder.
+    """
+
+    def __init__(self, basket_path=BASKET_FILE, customer_path=CUSTOMER_FILE, chunksize=None, cache_size=128):
+        self.basket_path = basket_path
+        self.customer_path = customer_path
+        self.chunksize = chunksize
+        self.cache = LRUCache(cache_size)
+        self._snapshot = Snapshot(None, None, None, None)
+        self._reload_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        # Küp, RFM ve grafik verisi ilk istekte tembel kurulur ve pyplot iş parçacığı
+        # güvenli değildir; analiz üzerindeki hesaplar sırayla yapılır
+        self._compute_lock = threading.Lock()
+        self.reload(force=True)
+
+    def snapshot(self):
+        with self._snapshot_lock:
+            return self._snapshot
+
+    @property
+    def analysis(self):
+        return self.snapshot().analysis
+
+    @property
+    def source(self):
+        return self.snapshot().source
+
+    @property
+    def loaded_at(self):
+        return self.snapshot().loaded_at
+
+    @property
+    def load_seconds(self):
+        return self.snapshot().load_seconds
+
+    def reload(self, force=False):
+        """Kaynaklar değiştiyse (veya force) veriyi yeniden yükler; yüklendiyse True döner."""
+        with self._reload_lock:
+            # Glob/klasör girdilerinde desenin kendisi değil eşleşen dosyalar izlenir
+            source = source_key(source_paths(self.basket_path) + [self.customer_path])
+            if not force and source == self.source:
+                return False
+            start = time.perf_counter()
+            analysis = SalesAnalysis(self.basket_path, self.customer_path, chunksize=self.chunksize)
+            analysis.summary  # Yükleme ve toplama istek gelmeden önce yapılır
+            snapshot = Snapshot(source, analysis, time.strftime('%Y-%m-%d %H:%M:%S'),
+                                time.perf_counter() - start)
+            with self._snapshot_lock:
+                self._snapshot = snapshot
+            self.cache.clear()
+            return True
+
+    def overview(self, snapshot):
+        summary = snapshot.analysis.summary
+        return json.dumps({
+            'row_count': summary.row_count,
+            'total_sales': summary.total_sales,
+            'n_customers': summary.n_customers,
+            'n_products': summary.n_products,
+            'mean_basket': summary.mean_basket,
+            'median_basket': float(summary.median_basket),
+            'date_min': str(summary.date_min.date()),
+            'date_max': str(summary.date_max.date()),
+            'loaded_at': snapshot.loaded_at,
+            'load_seconds': snapshot.load_seconds,
+            'cache': {'size': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses},
+        }, ensure_ascii=False).encode('utf-8')
+
+    def report(self, analysis, name, query):
+        if name == 'top_products' and 'n' in query:
+            return _to_json(top_products_table(analysis.summary, n=int(query['n'][0])))
+        with self._compute_lock:
+            table = analysis.report(name)
+        return _to_json(table)
+
+    def query(self, analysis, query):
+        params = {name: values[0] for name, values in query.items()}
+        with self._compute_lock:
+            result = analysis.query(**parse_query_params(params))
+        if result.ndim == 1:
+            return json.dumps({k: int(v) for k, v in result.items()}).encode('utf-8')
+        if 'n' in params:
+            result = top_k(result, int(params['n']))
+        return _to_json(result)
+
+    def chart(self, analysis, number):
+        with self._compute_lock:
+            return analysis.chart_png(number)
+
+    def respond(self, path, query):
+        """(durum, içerik tipi, gövde) döner; GET yanıtları LRU önbellekten gelir."""
+        snapshot = self.snapshot()
+        key = (snapshot.source, path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        parts = [p for p in path.split('/') if p]
+        if parts == ['ozet']:
+            # Önbellek sayaçlarını içerdiğinden her seferinde üretilir
+            return HTTPStatus.OK, 'application/json; charset=utf-8', self.overview(snapshot)
+        if not parts:
+            response = (HTTPStatus.OK, 'application/json; charset=utf-8', json.dumps({
+                'raporlar': [f'/rapor/{name}' for name in REPORTS],
+                'grafikler': [f'/grafik/{number}.png' for number in sorted(CHART_NUMBERS)],
+                'diger': ['/ozet', '/sorgu', 'POST /yenile'],
+            }, ensure_ascii=False).encode('utf-8'))
+        elif len(parts) == 2 and parts[0] == 'rapor' and parts[1] in REPORTS:
+            response = HTTPStatus.OK, 'application/json; charset=utf-8', self.report(snapshot.analysis, parts[1], query)
+        elif parts == ['sorgu']:
+            response = HTTPStatus.OK, 'application/json; charset=utf-8', self.query(snapshot.analysis, query)
+        elif (len(parts) == 2 and parts[0] == 'grafik' and parts[1].endswith('.png')
+              and parts[1][:-4].isdigit() and int(parts[1][:-4]) in CHART_NUMBERS):
+            response = HTTPStatus.OK, 'image/png', self.chart(snapshot.analysis, int(parts[1][:-4]))
+        else:
+            return HTTPStatus.NOT_FOUND, 'application/json; charset=utf-8', b'{"hata": "bulunamadi"}'
+        self.cache.put(key, response)
+        return response
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, 'application/json; charset=utf-8',
+                   json.dumps({'hata': message}, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            self._send(*self.service.respond(url.path, parse_qs(url.query)))
+        except (ValueError, KeyError) as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e.args[0]) if e.args else str(e))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/yenile':
+            self._error(HTTPStatus.NOT_FOUND, 'bulunamadi')
+            return
+        force = parse_qs(url.query).get('zorla', ['0'])[0] == '1'
+        try:
+            reloaded = self.service.reload(force=force)
+        except FileNotFoundError as e:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+            return
+        snapshot = self.service.snapshot()
+        self._send(HTTPStatus.OK, 'application/json; charset=utf-8', json.dumps({
+            'yenilendi': reloaded, 'loaded_at': snapshot.loaded_at,
+            'load_seconds': snapshot.load_seconds}).encode('utf-8'))
+
+
+def watch_sources(service, interval):
+    """Kaynak CSV'leri interval saniyede bir kontrol edip değiştiyse yeniden yükler."""
+    while True:
+        time.sleep(interval)
+        try:
+            if service.reload():
+                print(f"🔄 Kaynak dosyalar değişti, veri yeniden yüklendi ({service.load_seconds:.2f} sn)")
+        except FileNotFoundError:
+            pass  # Dosya yazılırken kısa süre eksik olabilir; sonraki kontrolde denenir
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='E-Ticaret satış raporu HTTP sunucusu')
+    parser.add_argument('--host', default='127.0.0.1', help='Dinlenecek adres (varsayılan: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Dinlenecek port (varsayılan: 8000)')
+    parser.add_argument('--sepet', default=BASKET_FILE, help='Sepet dosyası, glob deseni/klasör (örn. \'bolumler/*.csv.gz\') veya kolon deposu klasörü')
+    parser.add_argument('--musteri', default=CUSTOMER_FILE, help='Müşteri dosyası')
+    parser.add_argument('--parca-boyutu', type=int,
+                        help='Sepet dosyasını bu boyutta parçalarla akış modunda topla')
+    parser.add_argument('--onbellek-boyutu', type=int, default=128, help='LRU yanıt önbelleği boyutu')
+    parser.add_argument('--izle', type=float, metavar='SANIYE',
+                        help='Kaynak CSV\'leri bu aralıkla kontrol edip değişince otomatik yeniden yükle')
+    args = parser.parse_args()
+    # Grafikler istek iş parçacıklarında PNG olarak çizilir; ekran gerektirmeyen backend seçilir
+    os.environ['MPLBACKEND'] = BATCH_BACKEND
+
+    service = ReportService(args.sepet, args.musteri, chunksize=args.parca_boyutu,
+                            cache_size=args.onbellek_boyutu)
+    print(f"✅ Veri yüklendi ({service.analysis.summary.row_count:,} satır, {service.load_seconds:.2f} sn)")
+    if args.izle:
+        threading.Thread(target=watch_sources, args=(service, args.izle), daemon=True).start()
+
+    ReportHandler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), ReportHandler)
+    print(f"🌐 Rapor sunucusu: http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,366 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# EŞSİZ (DISTINCT) SAYIM
+# ============================================================
+# İki yöntem sunulur; ikisi de parça parça beslenebilir ve birleştirilebilir (merge):
+#
+#   ExactDistinct  Kesin sayım. 'sorted' modunda görülen kimliklerin sıralı eşsiz
+#                  dizisi (bellek: 8 bayt × eşsiz kimlik), 'bitmap' modunda kimlik
+#                  değeri başına 1 bit (negatif olmayan tamsayı kimlikler; bellek:
+#                  en büyük kimlik / 8 bayt, eşsiz sayısından bağımsız).
+#   HyperLogLog    Yaklaşık sayım. 2^p adet 1 baytlık register; göreli standart
+#                  hata ≈ 1.04 / √(2^p). p=14 → 16 KB, %0.81 (sonuçların ~%95'i
+#                  ±%1.6 içinde); p=12 → 4 KB, %1.6. Küçük kümelerde hata çok daha
+#                  düşüktür (tahminci boş register'ları doğrusal sayım gibi kullanır).
+#
+# GroupedDistinct aynı sayımı gün veya segment gibi bir anahtara göre grup başına yapar.
+
+HLL_PRECISION = 14
+
+
+def sorted_unique(values):
+    """Sıralı eşsiz değerler; tamsayı kimliklerde np.unique'ten belirgin hızlıdır."""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+# 0-255 arası her baytın bit sayısı (np.bitwise_count olmayan numpy sürümleri için)
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words):
+    """uint64 dizisindeki toplam 1 bit sayısı."""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class ExactDistinct:
+    """Kesin eşsiz sayacı; update() ile beslenir, merge() ile birleştirilir.
+
+    'sorted' modunda her parça önce kendi içinde tekilleştirilir, yalnızca yeni
+    kimlikler sıralı diziye searchsorted konumlarından eklenir. 'bitmap' modunda
+    kimlik v, 64 bitlik words[v >> 6] kelimesinin (v & 63). bitidir.
+    """
+
+    def __init__(self, mode='sorted'):
+        if mode not in ('sorted', 'bitmap'):
+            raise ValueError(f"Bilinmeyen mod: {mode} ('sorted' veya 'bitmap')")
+        self.mode = mode
+        self._values = np.array([], dtype=np.int64)
+        self._words = np.zeros(0, dtype=np.uint64)
+
+    def update(self, values):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return self
+        values = sorted_unique(values.astype(np.int64))
+        if self.mode == 'sorted':
+            self._insert(values)
+            return self
+        if values[0] < 0:
+            raise ValueError('bitmap modu negatif olmayan tamsayı kimlikler gerektirir')
+        top = int(values[-1] >> 6) + 1
+        if top > len(self._words):
+            # Büyüme payı bırakılır; ardışık parçalarda sürekli kopyalama olmasın
+            words = np.zeros(max(top, len(self._words) + len(self._words) // 2), dtype=np.uint64)
+            words[:len(self._words)] = self._words
+            self._words = words
+        # Değerler sıralı olduğundan aynı kelimeye düşen bitler ardışıktır; tek reduceat ile birleşir
+        index = values >> 6
+        bits = np.left_shift(np.uint64(1), (values & 63).astype(np.uint64))
+        starts = np.flatnonzero(np.concatenate([[True], index[1:] != index[:-1]]))
+        self._words[index[starts]] |= np.bitwise_or.reduceat(bits, starts)
+        return self
+
+    def _insert(self, values):
+        """Sıralı eşsiz values dizisindeki yeni kimlikleri sıralı diziye ekler."""
+        current = self._values
+        pos = np.searchsorted(current, values)
+        new = np.ones(len(values), dtype=bool)
+        inside = pos < len(current)
+        new[inside] = current[pos[inside]] != values[inside]
+        if new.any():
+            self._values = np.insert(current, pos[new], values[new])
+
+    def merge(self, other):
+        if other.mode != self.mode:
+            return self.update(other.values())
+        if self.mode == 'sorted':
+            self._insert(other._values)
+        else:
+            if len(other._words) > len(self._words):
+                self._words, other_words = other._words.copy(), self._words
+            else:
+                other_words = other._words
+            self._words[:len(other_words)] |= other_words
+        return self
+
+    def values(self):
+        """Görülen eşsiz kimlikler (sıralı)."""
+        if self.mode == 'sorted':
+            return self._values
+        return np.flatnonzero(np.unpackbits(self._words.astype('<u8').view(np.uint8), bitorder='little'))
+
+    def __len__(self):
+        return len(self._values) if self.mode == 'sorted' else _popcount(self._words)
+
+    def count(self):
+        return len(self)
+
+    @property
+    def nbytes(self):
+        return self._values.nbytes if self.mode == 'sorted' else self._words.nbytes
+
+
+def hash64(values):
+    """Tamsayı kimlikleri için vektörel splitmix64 karması (uint64)."""
+    x = np.asarray(values).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _bit_length(x):
+    """uint64 dizisindeki her değerin bit uzunluğu (32 bitlik yarılar float64'te kesin temsil edilir)."""
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+
+
+def _hll_observations(values, precision):
+    """Her değer için (register indeksi, rank) çifti."""
+    hashes = hash64(values)
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.intp)
+    rest = hashes & np.uint64((1 << width) - 1)
+    rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+    return index, rank
+
+
+def _sigma(x):
+    if x == 1:
+        return np.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+
+def _tau(x):
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+
+class HyperLogLog:
+    """Sabit bellekli, birleştirilebilir yaklaşık eşsiz sayacı (bkz. modül açıklaması)."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError('precision 4 ile 18 arasında olmalı')
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values):
+            index, rank = _hll_observations(values, self.precision)
+            np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError('Farklı precision değerine sahip HyperLogLog birleştirilemez')
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        # Ertl'in iyileştirilmiş tahmincisi (2017): register histogramından hesaplanır;
+        # klasik HLL'nin küçük/orta aralıktaki sapması için ampirik tablo gerektirmez.
+        m = len(self.registers)
+        q = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=q + 2)
+        z = m * _tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * _sigma(histogram[0] / m)
+        return int(round(m * m / (2 * np.log(2) * z)))
+
+    def __len__(self):
+        return self.count()
+
+    @property
+    def relative_error(self):
+        """Teorik göreli standart hata."""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+
+class GroupedDistinct:
+    """Bir anahtara (gün, yaş grubu, ...) göre grup başına eşsiz sayım.
+
+    approximate=True ise her grup için bir HyperLogLog tutulur ve bir parçadaki
+    tüm grupların register'ları tek bir vektörel np.maximum.at ile güncellenir.
+    Eksik (NaN) anahtarlı satırlar groupby'daki gibi atlanır.
+    """
+
+    def __init__(self, approximate=False, precision=HLL_PRECISION, mode='sorted'):
+        self.approximate = approximate
+        self.precision = precision
+        self.mode = mode
+        self.groups = {}
+        self._dtype = None
+        self._name = None
+
+    def _new(self):
+        return HyperLogLog(self.precision) if self.approximate else ExactDistinct(self.mode)
+
+    def update(self, keys, values):
+        keys = pd.Series(keys)
+        if self._dtype is None:
+            self._dtype, self._name = keys.dtype, keys.name
+        codes, labels = pd.factorize(keys, sort=True)
+        values = np.asarray(values)
+        present = codes >= 0
+        codes, values = codes[present], values[present]
+        if len(values) == 0:
+            return self
+
+        if self.approximate:
+            m = 1 << self.precision
+            index, rank = _hll_observations(values, self.precision)
+            registers = np.zeros(len(labels) * m, dtype=np.uint8)
+            np.maximum.at(registers, codes * m + index, rank)
+            registers = registers.reshape(len(labels), m)
+            for code, label in enumerate(labels):
+                sketch = self.groups.setdefault(label, self._new())
+                np.maximum(sketch.registers, registers[code], out=sketch.registers)
+            return self
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        for code, label in enumerate(labels):
+            self.groups.setdefault(label, self._new()).update(values[order[bounds[code]:bounds[code + 1]]])
+        return self
+
+    def merge(self, other):
+        if self._dtype is None:
+            self._dtype, self._name = other._dtype, other._name
+        for label, counter in other.groups.items():
+            # other'ın sayaçları paylaşılmaz: sonraki update()'ler iki nesneyi birden değiştirmesin
+            self.groups.setdefault(label, self._new()).merge(counter)
+        return self
+
+    def result(self):
+        """Grup → eşsiz sayı serisi (kategorik anahtarlarda kategori sırasıyla)."""
+        labels = list(self.groups)
+        if isinstance(self._dtype, pd.CategoricalDtype):
+            index = pd.CategoricalIndex(labels, dtype=self._dtype, name=self._name)
+        else:
+            index = pd.Index(labels, name=self._name)
+        counts = pd.Series([self.groups[label].count() for label in labels], index=index, dtype='int64')
+        return counts.sort_index()
+
+    @property
+    def nbytes(self):
+        return sum(counter.nbytes for counter in self.groups.values())
+
+
+def distinct_counter(approximate=False, by=None, precision=HLL_PRECISION, mode='sorted'):
+    """Yönteme göre uygun sayacı oluşturur."""
+    if by is not None:
+        return GroupedDistinct(approximate=approximate, precision=precision, mode=mode)
+    return HyperLogLog(precision) if approximate else ExactDistinct(mode)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(df, precisions=(12, 14)):
+    """pandas nunique ile kesin ve yaklaşık yöntemlerin süre, bellek ve hatasını karşılaştırır."""
+    rows = []
+    for column in ['customer_id', 'product_id']:
+        values = df[column].to_numpy()
+        expected, seconds = _timed(lambda: df[column].nunique())
+        rows.append((column, 'toplam', 'pandas nunique', seconds, None, expected, expected))
+        for mode in ['sorted', 'bitmap']:
+            counter, seconds = _timed(lambda: ExactDistinct(mode).update(values))
+            rows.append((column, 'toplam', f'kesin ({mode})', seconds, counter.nbytes, len(counter), expected))
+        for p in precisions:
+            sketch, seconds = _timed(lambda: HyperLogLog(p).update(values))
+            rows.append((column, 'toplam', f'HLL p={p}', seconds, sketch.nbytes, sketch.count(), expected))
+
+        expected_daily, seconds = _timed(lambda: df.groupby('basket_date')[column].nunique())
+        rows.append((column, 'günlük', 'pandas nunique', seconds, None, expected_daily, expected_daily))
+        counter, seconds = _timed(lambda: GroupedDistinct().update(df['basket_date'], values))
+        rows.append((column, 'günlük', 'kesin (sorted)', seconds, counter.nbytes, counter.result(), expected_daily))
+        for p in precisions:
+            counter, seconds = _timed(lambda: GroupedDistinct(True, p).update(df['basket_date'], values))
+            rows.append((column, 'günlük', f'HLL p={p}', seconds, counter.nbytes, counter.result(), expected_daily))
+
+    print(f"{'Kolon':<12} {'Kapsam':<7} {'Yöntem':<16} {'Süre (sn)':>10} {'Durum (KB)':>11} "
+          f"{'Sonuç':>10} {'Hata (%)':>9}")
+    for column, scope, method, seconds, nbytes, result, expected in rows:
+        if isinstance(result, pd.Series):
+            error = ((result - expected).abs() / expected).max() * 100
+            shown = f'{len(result)} gün'
+        else:
+            error = abs(result - expected) / expected * 100
+            shown = f'{result:,}'
+        size = f'{nbytes / 1e3:,.0f}' if nbytes is not None else '-'
+        print(f"{column:<12} {scope:<7} {method:<16} {seconds:>10.3f} {size:>11} {shown:>10} {error:>9.2f}")
+    print('   (günlük satırlarda hata: en kötü günün göreli hatası)')
+
+
+if __name__ == '__main__':
+    from hazirlik import BASKET_FILE, parse_basket_dates, read_basket
+    from sentetik_veri import generate
+
+    parser = argparse.ArgumentParser(description='Kesin ve yaklaşık eşsiz sayım benchmark\'ı')
+    parser.add_argument('--satir', type=float, default=1e6, help='Sentetik sepet satırı sayısı')
+    parser.add_argument('--veri-dizini', help='Sentetik veri yerine bu klasördeki basket_details.csv')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.veri_dizini or tmp
+        if not args.veri_dizini:
+            print(f"🧪 {int(args.satir):,} satırlık sentetik veri üretiliyor...")
+            generate(data_dir, int(args.satir))
+        df = parse_basket_dates(read_basket(os.path.join(data_dir, BASKET_FILE)))
+    print(f"📊 {len(df):,} sepet satırı\n")
+    run_benchmark(df)
@@ -0,0 +1,460 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import (AGE_BINS, BASKET_FILE, CUSTOMER_FILE, REPLACE_MAP, CustomerIndex,
+                      parse_basket_dates, read_basket, read_customers, replace_values)
+from tekil_sayim import hash64
+
+# ============================================================
+# KURAL TABANLI VERİ TEMİZLEME
+# ============================================================
+# Temizleme, sırayla uygulanan kurallardan oluşur. Değer kuralları (eşleme,
+# aralık sınırlama, doldurma) kolon bazında gruplanır: her kolon bir kez
+# okunur, kuralları numpy dizisi üzerinde ardışık uygulanır ve bir kez geri
+# yazılır. Satır kuralları (tekrar, yetim müşteri, geçersiz adet) tek bir
+# "tutulacak" maskesinde birleşir; tablo en sonda bir kez süzülür. Her kural
+# etkilediği satır sayısını raporlar; bir satır yalnızca onu ilk düşüren
+# kurala sayılır.
+#
+# Cleaner parça parça da beslenebilir (akış modu): sayaçlar birikir, tekrar
+# kuralı önceki parçalarda görülen satırları hatırlar. Paralel modda her
+# bölüm kendi kopyasını (spawn) kullanır ve sayaçlar merge() ile toplanır;
+# tekrar kuralı varken bölümler gün sınırlarından ayrılır (partition_keys).
+
+
+class ValueMap:
+    """Kolon değerlerini sözlükle eşler; kategorik kolonlarda kategoriler üzerinde çalışır."""
+
+    def __init__(self, column, mapping, description=None):
+        self.column = column
+        self.mapping = dict(mapping)
+        self.description = description or f"{column} değerleri eşlendi"
+
+    def apply(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Satırlar yerine kategori frekansları sayılır
+            codes = series.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+            changed = sum(int(counts[i]) for i, c in enumerate(series.cat.categories)
+                          if c in self.mapping and self.mapping[c] != c)
+        else:
+            changed = int(series.isin([k for k, v in self.mapping.items() if k != v]).sum())
+        if not changed:
+            return series, 0
+        return replace_values(series, self.mapping), changed
+
+
+class Clamp:
+    """[lower, upper] dışındaki değerleri en yakın sınıra çeker."""
+
+    def __init__(self, column, lower=None, upper=None, description=None):
+        self.column = column
+        self.lower = lower
+        self.upper = upper
+        self.description = description or f"{column} [{lower}, {upper}] aralığına çekildi"
+
+    def apply(self, series):
+        values = series.to_numpy()
+        low = values < self.lower if self.lower is not None else np.zeros(len(values), dtype=bool)
+        high = values > self.upper if self.upper is not None else np.zeros(len(values), dtype=bool)
+        changed = int(np.count_nonzero(low) + np.count_nonzero(high))
+        if not changed:
+            return series, 0
+        values = values.copy()
+        values[low] = self.lower
+        values[high] = self.upper
+        return pd.Series(values, index=series.index, name=series.name), changed
+
+
+class Impute:
+    """Aralık dışındaki (missing=True ise eksik) değerleri value ile doldurur.
+
+    value 'median' veya 'mean' ise istatistik, kural uygulanmadan önceki
+    kolondan hesaplanır; parça parça temizlemede her parçanın kendi değeri
+    kullanılacağından sepet kuralları için sabit bir değer verilmelidir.
+    """
+
+    def __init__(self, column, value='median', lower=None, upper=None, missing=True, description=None):
+        self.column = column
+        self.value = value
+        self.lower = lower
+        self.upper = upper
+        self.missing = missing
+        self.description = description or f"{column} aykırı/eksik değerleri dolduruldu ({value})"
+
+    def apply(self, series):
+        values = series.to_numpy()
+        bad = np.zeros(len(values), dtype=bool)
+        if self.lower is not None:
+            bad |= values < self.lower
+        if self.upper is not None:
+            bad |= values > self.upper
+        if self.missing and values.dtype.kind == 'f':
+            bad |= np.isnan(values)
+        changed = int(np.count_nonzero(bad))
+        if not changed:
+            return series, 0
+        if self.value == 'median':
+            fill = series.median()
+        elif self.value == 'mean':
+            fill = series.mean()
+        else:
+            fill = self.value
+        values = np.where(bad, fill, values).astype(values.dtype)
+        return pd.Series(values, index=series.index, name=series.name), changed
+
+
+class DropRange:
+    """column değeri [lower, upper] dışında kalan satırları atar (örn. sıfır/negatif adet)."""
+
+    def __init__(self, column, lower=None, upper=None, description=None):
+        self.column = column
+        self.lower = lower
+        self.upper = upper
+        self.description = description or f"{column} [{lower}, {upper}] dışında kalan satırlar atıldı"
+
+    def drop(self, df, keep, state, customer_index):
+        values = df[self.column].to_numpy()
+        drop = np.zeros(len(values), dtype=bool)
+        if self.lower is not None:
+            drop |= values < self.lower
+        if self.upper is not None:
+            drop |= values > self.upper
+        return drop
+
+
+class DropDuplicates:
+    """Tüm (veya subset) kolonları aynı olan tekrar satırlarını atar; ilk görülen kalır.
+
+    Satırlar 64 bitlik karmayla gruplanır, ancak bir satır yalnızca kolon
+    değerleri de aynıysa tekrar sayılır; karma çakışması farklı bir satırı
+    atmaz. Görülen satırların karmaları ve anahtar değerleri parçalar arasında
+    birkaç sıralı dizide saklanır. Sayısal, bool, tarih ve kategorik kolonlar
+    karşılaştırılabilir; metin kolonları ValueError verir.
+
+    Karşılaştırılan kolonlar basket_date'i içeriyorsa tekrarlar hep aynı
+    gündedir (partition_key); paralel toplama aynı günün satırlarını aynı
+    bölüme koyar ve güne göre sıralı girdide biten günler bırakılır (advance).
+    İçermiyorsa girdi tek bölümde temizlenir.
+    """
+
+    def __init__(self, subset=None, description=None):
+        self.column = None
+        self.subset = subset
+        self.partition_key = 'basket_date' if subset is None or 'basket_date' in subset else None
+        self.description = description or "Tekrar eden sepet satırları atıldı"
+
+    def row_keys(self, df, rows, state):
+        """Karşılaştırılan her kolon için int64 ile karşılaştırılabilir anahtar dizisi."""
+        columns = list(self.subset or df.columns)
+        if 'basket_date' in columns:
+            state['date_key'] = columns.index('basket_date')
+        keys = []
+        for column in columns:
+            values = _key_values(df[column], column, state)
+            keys.append(values if rows is None else values[rows])
+        return keys
+
+    def drop(self, df, keep, state, customer_index):
+        runs = state.setdefault('runs', [])
+        rows = np.flatnonzero(keep)
+        keys = self.row_keys(df, rows if len(rows) < len(df) else None, state)
+        hashes = _hash_keys(keys, len(rows))
+        # Kararlı sıralama: eşit satırların ilki dosyadaki ilk satırdır
+        order = np.argsort(hashes, kind='stable')
+        same_hash, same_key = _adjacent_equal(hashes, keys, order)
+        if (same_hash & ~same_key).any():
+            # Aynı karmalı farklı satırlar var: eşit satırlar yan yana gelsin diye
+            # karma ve tüm anahtarlara göre sıralanır
+            order = np.lexsort(keys[::-1] + [hashes])
+            same_hash, same_key = _adjacent_equal(hashes, keys, order)
+        ordered = hashes[order]
+        ordered_keys = [values[order] for values in keys]
+        first = np.ones(len(ordered), dtype=bool)
+        first[1:] = ~same_key
+        for seen, seen_keys in runs:
+            first &= ~_contains(seen, seen_keys, ordered, ordered_keys, first)
+        if first.any():
+            runs.append((ordered[first], [values[first] for values in ordered_keys]))
+            # Sıralı diziler boyları ikişer katlanacak şekilde birleştirilir (rfm.CustomerStats
+            # gibi): her satır O(log n) kez kopyalanır, aranan dizi sayısı O(log n) kalır
+            while len(runs) > 1 and len(runs[-2][0]) <= len(runs[-1][0]):
+                runs[-2:] = [_merge_runs(*runs[-2:])]
+        drop = np.zeros(len(df), dtype=bool)
+        drop[rows[order[~first]]] = True
+        return drop
+
+    def advance(self, state, day):
+        """day'den önceki günlerin satırlarını bırakır (girdi güne göre sıralıyken)."""
+        if self.partition_key is None or 'date_key' not in state:
+            return
+        day = np.datetime64(pd.Timestamp(day).date(), 'D').astype(_DATE_UNIT).astype(np.int64)
+        runs = []
+        for seen, seen_keys in state.get('runs', []):
+            current = seen_keys[state['date_key']] >= day
+            if current.all():
+                runs.append((seen, seen_keys))
+            elif current.any():
+                runs.append((seen[current], [values[current] for values in seen_keys]))
+        state['runs'] = runs
+
+
+# Tekrar anahtarında tarihlerin ortak birimi
+_DATE_UNIT = 'datetime64[us]'
+
+
+def _key_values(series, column, state):
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Kodlar parçalar arasında tutarlı olsun diye kategoriler ilk görüldükleri sırayla birikir
+        known = state.setdefault('categories', {}).get(column)
+        categories = series.cat.categories
+        known = categories if known is None else known.append(categories[~categories.isin(known)])
+        state['categories'][column] = known
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, known.get_indexer(categories)[codes], -1)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(dtype):
+        series = series.astype('float64')
+    values = series.to_numpy()
+    if values.dtype.kind == 'M':
+        return values.astype(_DATE_UNIT).view(np.int64)
+    if values.dtype.kind == 'f':
+        # Bit deseniyle karşılaştırılır; + 0.0 ile -0.0 ve 0.0 eşitlenir
+        return (values.astype(np.float64) + 0.0).view(np.int64)
+    if values.dtype.kind in 'biu':
+        return values
+    raise ValueError(f"Tekrar kuralı yalnızca sayısal, bool, tarih ve kategorik kolonları "
+                     f"karşılaştırabilir: '{column}' ({dtype})")
+
+
+def _hash_keys(keys, n):
+    hashes = np.zeros(n, dtype=np.uint64)
+    for values in keys:
+        hashes = hash64(hashes ^ values.astype(np.int64).astype(np.uint64))
+    return hashes
+
+
+def _adjacent_equal(hashes, keys, order):
+    """Sıralanmış satırlarda her satırın bir öncekiyle karması ve tüm anahtarları eşit mi."""
+    ordered = hashes[order]
+    same_hash = ordered[1:] == ordered[:-1]
+    same_key = same_hash.copy()
+    for values in keys:
+        values = values[order]
+        same_key &= values[1:] == values[:-1]
+    return same_hash, same_key
+
+
+def _contains(seen, seen_keys, hashes, keys, candidates):
+    """candidates satırlarından hangileri (karma ve anahtarlarıyla) seen dizisinde var."""
+    found = np.zeros(len(hashes), dtype=bool)
+    pos = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+    hit = np.flatnonzero(candidates & (seen[pos] == hashes))
+    match = np.ones(len(hit), dtype=bool)
+    for stored, values in zip(seen_keys, keys):
+        match &= stored[pos[hit]] == values[hit]
+    found[hit[match]] = True
+    # Karma çakışması: aynı karmalı sonraki kayıtlar da denenir (nadir)
+    for i in hit[~match]:
+        j = pos[i] + 1
+        while j < len(seen) and seen[j] == hashes[i]:
+            if all(stored[j] == values[i] for stored, values in zip(seen_keys, keys)):
+                found[i] = True
+                break
+            j += 1
+    return found
+
+
+def _merge_runs(a, b):
+    """Karmaya göre sıralı iki (karma, anahtarlar) dizisini birleştirir."""
+    seen = np.concatenate([a[0], b[0]])
+    # Diziler zaten sıralı; kararlı sıralama ikisini birleştirir (quicksort'tan hızlı)
+    order = np.argsort(seen, kind='stable')
+    return seen[order], [np.concatenate([x, y])[order] for x, y in zip(a[1], b[1])]
+
+
+class DropOrphans:
+    """Müşteri tablosunda bulunmayan customer_id'lere ait satırları atar."""
+
+    def __init__(self, key='customer_id', description=None):
+        self.column = None
+        self.key = key
+        self.description = description or "Müşteri tablosunda bulunmayan (yetim) müşteri satırları atıldı"
+
+    def drop(self, df, keep, state, customer_index):
+        if customer_index is None:
+            raise ValueError('Yetim müşteri kuralı için customer_index gerekli')
+        return customer_index.positions(df[self.key].to_numpy()) < 0
+
+
+VALUE_RULES = (ValueMap, Clamp, Impute)
+
+
+class Cleaner:
+    """Kuralları bir tabloya veya ardışık parçalara uygular; kural başına sayaç tutar."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.counts = [0] * len(self.rules)
+        self._states = [{} for _ in self.rules]
+
+    def spawn(self):
+        """Aynı kurallarla, sayaçları ve tekrar hafızası boş yeni bir Cleaner."""
+        return Cleaner(self.rules)
+
+    def clean(self, df, customer_index=None):
+        """Temizlenmiş tabloyu döner; girdi değiştirilmez."""
+        if len(df) == 0:
+            return df
+        by_column = {}
+        for i, rule in enumerate(self.rules):
+            if isinstance(rule, VALUE_RULES):
+                by_column.setdefault(rule.column, []).append(i)
+        updates = {}
+        for column, indices in by_column.items():
+            series = df[column]
+            for i in indices:
+                series, changed = self.rules[i].apply(series)
+                self.counts[i] += changed
+            updates[column] = series
+        if updates:
+            df = df.assign(**updates)
+
+        keep = None
+        for i, rule in enumerate(self.rules):
+            if isinstance(rule, VALUE_RULES):
+                continue
+            if keep is None:
+                keep = np.ones(len(df), dtype=bool)
+            drop = rule.drop(df, keep, self._states[i], customer_index) & keep
+            self.counts[i] += int(np.count_nonzero(drop))
+            keep &= ~drop
+        if keep is not None and not keep.all():
+            df = df[keep]
+        return df
+
+    def advance(self, day):
+        """Girdi güne göre sıralıysa: day'den önceki günlerin satırları bir daha gelmez.
+
+        Durum tutan kurallar (tekrar) o günlerin hafızasını bırakır; bellek bir
+        günün satır sayısıyla sınırlı kalır.
+        """
+        for rule, state in zip(self.rules, self._states):
+            if hasattr(rule, 'advance'):
+                rule.advance(state, day)
+
+    @property
+    def partition_keys(self):
+        """Bölümler arası durum tutan kuralların bölümleme isteği.
+
+        Boş küme: bölümler birbirinden bağımsız temizlenebilir. {'basket_date'}:
+        aynı günün satırları aynı bölümde olmalı. None içeriyorsa girdi tek
+        bölümde temizlenmelidir (bkz. paralel.partitions).
+        """
+        return {rule.partition_key for rule in self.rules if hasattr(rule, 'partition_key')}
+
+    def merge(self, other):
+        """Başka bir bölümde aynı kurallarla biriken sayaçları ekler."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return self
+
+    def report(self):
+        """Kural açıklaması → etkilenen satır sayısı."""
+        return pd.Series(self.counts, index=[rule.description for rule in self.rules],
+                         dtype='int64', name='Satır')
+
+    @property
+    def dropped(self):
+        """Satır kurallarının attığı toplam satır."""
+        return sum(n for n, rule in zip(self.counts, self.rules) if not isinstance(rule, VALUE_RULES))
+
+
+# ============================================================
+# KURAL PROFİLLERİ
+# ============================================================
+# standart: raporun önceki davranışı (cinsiyet eşlemesi, 100 üstü yaşa medyan)
+# ve zaten anlamsız olan sıfır/negatif adetli satırların atılması.
+# siki: ek olarak negatif/eksik yaşlar doldurulur, yaş rapor aralığına çekilir,
+# tekrar eden sepet satırları ve yetim müşteri satırları atılır.
+DEFAULT_PROFILE = 'standart'
+
+PROFILES = {
+    'standart': {
+        'customer': [
+            ValueMap('sex', REPLACE_MAP, description='Cinsiyet kolonu temizlendi'),
+            Impute('customer_age', upper=100, missing=False, description='Yaş anomalileri düzeltildi'),
+        ],
+        'basket': [
+            DropRange('basket_count', lower=1, description='Sıfır/negatif basket_count satırları atıldı'),
+        ],
+    },
+    'siki': {
+        'customer': [
+            ValueMap('sex', REPLACE_MAP, description='Cinsiyet kolonu temizlendi'),
+            Impute('customer_age', lower=0, upper=100, description='Yaş anomalileri ve eksik yaşlar düzeltildi'),
+            Clamp('customer_age', lower=18, upper=AGE_BINS[-1],
+                  description='Yaş rapor aralığına çekildi'),
+        ],
+        'basket': [
+            DropRange('basket_count', lower=1, description='Sıfır/negatif basket_count satırları atıldı'),
+            DropOrphans(),
+            DropDuplicates(),
+        ],
+    },
+}
+
+
+def cleaners(profile=DEFAULT_PROFILE):
+    """Profil için (müşteri, sepet) Cleaner çifti."""
+    rules = PROFILES[profile]
+    return Cleaner(rules['customer']), Cleaner(rules['basket'])
+
+
+def print_report(cleaner):
+    for description, count in cleaner.report().items():
+        print(f"   ✓ {description} ({count:,} satır)")
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(basket_path, customer_path, profile, chunksize):
+    """Tüm tabloyu ve parça parça temizlemeyi karşılaştırır; kural raporlarını yazar."""
+    customer_cleaner, basket_cleaner = cleaners(profile)
+    customers = read_customers(customer_path)
+    start = time.perf_counter()
+    customers = customer_cleaner.clean(customers)
+    index = CustomerIndex(customers)
+    print(f"👤 Müşteri kuralları ({time.perf_counter() - start:.2f} sn):")
+    print_report(customer_cleaner)
+
+    df_basket = parse_basket_dates(read_basket(basket_path))
+    start = time.perf_counter()
+    cleaned = basket_cleaner.clean(df_basket, index)
+    print(f"\n🛒 Sepet kuralları, tek parça ({time.perf_counter() - start:.2f} sn, "
+          f"{len(df_basket):,} → {len(cleaned):,} satır):")
+    print_report(basket_cleaner)
+
+    chunked = basket_cleaner.spawn()
+    start = time.perf_counter()
+    rows = sum(len(chunked.clean(df_basket.iloc[i:i + chunksize], index))
+               for i in range(0, len(df_basket), chunksize))
+    same = chunked.counts == basket_cleaner.counts and rows == len(cleaned)
+    print(f"\n🌊 Parça parça ({chunksize:,} satır): {time.perf_counter() - start:.2f} sn, "
+          f"sayaçlar {'aynı' if same else 'FARKLI'}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kural tabanlı veri temizleme raporu')
+    parser.add_argument('--sepet', default=BASKET_FILE, help='Sepet kaynağı (CSV, klasör, glob, depo)')
+    parser.add_argument('--musteri', default=CUSTOMER_FILE, help='Müşteri CSV dosyası')
+    parser.add_argument('--profil', default=DEFAULT_PROFILE, choices=sorted(PROFILES),
+                        help=f'Kural profili (varsayılan: {DEFAULT_PROFILE})')
+    parser.add_argument('--parca-boyutu', type=int, default=100_000,
+                        help='Parça parça temizleme için satır sayısı')
+    args = parser.parse_args()
+    run_benchmark(args.sepet, args.musteri, args.profil, args.parca_boyutu)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+# Modüller depo kökündedir (paket değil)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hazirlik import BASKET_FILE, CUSTOMER_FILE  # noqa: E402
+from sentetik_veri import generate  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def data_dir(tmp_path_factory):
+    """Tüm testlerin paylaştığı küçük sentetik veri seti (31 gün)."""
+    path = tmp_path_factory.mktemp('veri')
+    generate(str(path), 20_000, n_products=3_000, days=31)
+    return path
+
+
+@pytest.fixture(scope='session')
+def basket_path(data_dir):
+    return str(data_dir / BASKET_FILE)
+
+
+@pytest.fixture(scope='session')
+def customer_path(data_dir):
+    return str(data_dir / CUSTOMER_FILE)
+
+
+@pytest.fixture(scope='session')
+def duplicate_dir(data_dir, tmp_path_factory):
+    """data_dir'in tekrar eden satırlar eklenmiş ve karıştırılmış kopyası."""
+    import pandas as pd
+
+    path = tmp_path_factory.mktemp('tekrar')
+    basket = pd.read_csv(data_dir / BASKET_FILE)
+    basket = pd.concat([basket, basket.sample(2_000, random_state=1)])
+    basket.sample(frac=1, random_state=2).to_csv(path / BASKET_FILE, index=False)
+    (path / CUSTOMER_FILE).write_bytes((data_dir / CUSTOMER_FILE).read_bytes())
+    return path
+
+
+def assert_summary_equal(actual, expected):
+    """İki SalesSummary'nin rapor değer ve tablolarının aynı olduğunu doğrular."""
+    import pandas as pd
+
+    for name in ['row_count', 'total_sales', 'n_customers', 'n_products', 'mean_basket', 'median_basket',
+                 'date_min', 'date_max']:
+        assert getattr(actual, name) == getattr(expected, name), name
+    for name in ['products', 'daily', 'sex', 'age_group', 'day_of_week', 'tenure', 'gender_age', 'missing']:
+        left, right = getattr(actual, name), getattr(expected, name)
+        if isinstance(left, pd.DataFrame):
+            pd.testing.assert_frame_equal(left, right, obj=name)
+        else:
+            pd.testing.assert_series_equal(left, right, obj=name)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from en_cok_satan import SpaceSaving, heavy_hitters, product_totals, top_k
+
+
+def _table(n, distinct, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.Index(rng.permutation(n) + 1000, name='product_id')
+    return pd.DataFrame({'sum': rng.integers(0, distinct, n), 'count': rng.integers(1, 5, n)}, index=index)
+
+
+@pytest.mark.parametrize('distinct', [1, 3, 50, 10_000])
+@pytest.mark.parametrize('ascending', [False, True])
+def test_top_k_matches_stable_sort(distinct, ascending):
+    table = _table(500, distinct, seed=distinct)
+    for k in [0, 1, 5, 10, 250, 499, 500, 600]:
+        expected = table.sort_values('sum', ascending=ascending, kind='stable').head(k)
+        pd.testing.assert_frame_equal(top_k(table, k, ascending=ascending), expected)
+
+
+def test_top_k_on_report_products(basket_path):
+    from hazirlik import parse_basket_dates, read_basket
+
+    products = product_totals(parse_basket_dates(read_basket(basket_path)))
+    for ascending in [False, True]:
+        expected = products.sort_values('sum', ascending=ascending, kind='stable').head(10)
+        pd.testing.assert_frame_equal(top_k(products, 10, ascending=ascending), expected)
+
+
+@pytest.mark.parametrize('method', ['space_saving', 'count_min'])
+def test_heavy_hitters_bound_the_true_sums(basket_path, method):
+    from hazirlik import parse_basket_dates, read_basket
+
+    df = parse_basket_dates(read_basket(basket_path))
+    summary = heavy_hitters(method, 1000)
+    for start in range(0, len(df), 3_000):
+        summary.update(df.iloc[start:start + 3_000])
+    found = summary.result(10, errors=True) if isinstance(summary, SpaceSaving) else summary.result(10)
+    exact = product_totals(df)['sum'].reindex(found.index, fill_value=0)
+    assert (found['sum'] >= exact).all()
+    if isinstance(summary, SpaceSaving):
+        assert (found['sum'] - found['error'] <= exact).all()
@@ -0,0 +1,41 @@
+import pytest
+
+from kup import SalesCube, cross_check
+from satis_analizi import SalesAnalysis
+
+QUERIES = [
+    {},
+    {'by': 'product_id'},
+    {'by': ['sex', 'age_group']},
+    {'by': 'basket_date', 'start': '2019-05-25', 'end': '2019-06-02'},
+    {'by': 'product_id', 'sex': 'Female', 'age_group': ['26-35', '36-45']},
+    {'by': 'tenure_group', 'day_of_week': ['Saturday', 'Sunday']},
+    {'start': '2019-06-01', 'sex': 'Male'},
+]
+
+
+@pytest.fixture(scope='module')
+def analysis(basket_path, customer_path):
+    return SalesAnalysis(basket_path, customer_path)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_cube_matches_raw_rollup(analysis, query):
+    cross_check(analysis.cube, analysis.merged, **query)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_chunked_cube_matches_raw_rollup(analysis, query):
+    cube = SalesCube()
+    for start in range(0, len(analysis.merged), 3_000):
+        cube.update(analysis.merged.iloc[start:start + 3_000])
+    cross_check(cube, analysis.merged, **query)
+
+
+def test_cube_accepts_updates_after_queries(analysis):
+    merged = analysis.merged
+    half = len(merged) // 2
+    cube = SalesCube().update(merged.iloc[:half])
+    cube.query(by='sex')
+    cube.update(merged.iloc[half:])
+    cross_check(cube, merged, by='product_id')
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tekil_sayim import ExactDistinct, GroupedDistinct, HyperLogLog
+
+
+@pytest.fixture(scope='module')
+def frame(basket_path):
+    from hazirlik import parse_basket_dates, read_basket
+
+    return parse_basket_dates(read_basket(basket_path))
+
+
+def _chunks(values, size=3_000):
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+@pytest.mark.parametrize('mode', ['sorted', 'bitmap'])
+@pytest.mark.parametrize('column', ['customer_id', 'product_id'])
+def test_exact_distinct_matches_nunique(frame, mode, column):
+    values = frame[column].to_numpy()
+    left, right = ExactDistinct(mode), ExactDistinct(mode)
+    for i, chunk in enumerate(_chunks(values)):
+        (left if i % 2 else right).update(chunk)
+    assert len(left.merge(right)) == frame[column].nunique()
+    np.testing.assert_array_equal(left.values(), np.sort(frame[column].unique()))
+
+
+def test_exact_distinct_merges_across_modes(frame):
+    values = frame['customer_id'].to_numpy()
+    half = len(values) // 2
+    counter = ExactDistinct('sorted').update(values[:half]).merge(ExactDistinct('bitmap').update(values[half:]))
+    assert counter.count() == frame['customer_id'].nunique()
+
+
+def test_bitmap_uses_one_bit_per_id():
+    counter = ExactDistinct('bitmap').update(np.array([0, 63, 64, 10_000, 10_000]))
+    assert counter.count() == 4
+    assert counter.nbytes <= 10_000 // 8 + 8
+    with pytest.raises(ValueError):
+        counter.update(np.array([-1]))
+
+
+def test_hyperloglog_is_within_error_bound(frame):
+    sketch = HyperLogLog(12)
+    for chunk in _chunks(frame['customer_id'].to_numpy()):
+        sketch.update(chunk)
+    expected = frame['customer_id'].nunique()
+    assert abs(sketch.count() - expected) / expected < 4 * sketch.relative_error
+
+
+@pytest.mark.parametrize('by', ['basket_date', 'basket_count'])
+def test_grouped_distinct_matches_groupby_nunique(frame, by):
+    left, right = GroupedDistinct(), GroupedDistinct()
+    for i, chunk in enumerate(_chunks(frame)):
+        (left if i % 2 else right).update(chunk[by], chunk['customer_id'].to_numpy())
+    expected = frame.groupby(by)['customer_id'].nunique()
+    pd.testing.assert_series_equal(GroupedDistinct().merge(left).merge(right).result(), expected,
+                                   check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('approximate', [False, True])
+def test_grouped_distinct_merge_does_not_share_counters(approximate):
+    source = GroupedDistinct(approximate).update(pd.Series([1, 1, 2]), np.array([5, 6, 7]))
+    target = GroupedDistinct(approximate).merge(source)
+    target.update(pd.Series([1]), np.array([99]))
+    assert source.result().tolist() == [2, 1]
+    assert target.result().tolist() == [3, 1]
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import temizlik
+from hazirlik import BASKET_FILE, CUSTOMER_FILE, CustomerIndex, parse_basket_dates, read_basket, read_customers
+from temizlik import Cleaner, DropDuplicates, cleaners
+
+
+@pytest.fixture(scope='module')
+def duplicates(duplicate_dir):
+    return parse_basket_dates(read_basket(str(duplicate_dir / BASKET_FILE)))
+
+
+def _drop_in_chunks(df, rule, size, ordered=False):
+    cleaner = Cleaner([rule])
+    kept = []
+    for start in range(0, len(df), size):
+        chunk = df.iloc[start:start + size]
+        if ordered:
+            cleaner.advance(chunk['basket_date'].iloc[0])
+        kept.append(cleaner.clean(chunk))
+    return pd.concat(kept), cleaner
+
+
+@pytest.mark.parametrize('size', [1_000, 7_000, 100_000])
+def test_drop_duplicates_matches_pandas(duplicates, size):
+    kept, cleaner = _drop_in_chunks(duplicates, DropDuplicates(), size)
+    expected = duplicates[~duplicates.duplicated()]
+    pd.testing.assert_frame_equal(kept, expected)
+    assert cleaner.counts == [len(duplicates) - len(expected)]
+
+
+def test_drop_duplicates_on_subset(duplicates):
+    subset = ['customer_id', 'product_id']
+    kept, _ = _drop_in_chunks(duplicates, DropDuplicates(subset), 5_000)
+    pd.testing.assert_frame_equal(kept, duplicates[~duplicates.duplicated(subset)])
+
+
+def test_drop_duplicates_with_day_ordered_input(duplicates):
+    ordered = duplicates.sort_values('basket_date', kind='stable')
+    kept, cleaner = _drop_in_chunks(ordered, DropDuplicates(), 2_000, ordered=True)
+    pd.testing.assert_frame_equal(kept, ordered[~ordered.duplicated()])
+    # Biten günler bırakılır: hafızada yalnızca son parçanın başladığı günden itibaren satırlar kalır
+    last_day = ordered['basket_date'].iloc[(len(ordered) - 1) // 2_000 * 2_000]
+    runs = cleaner._states[0]['runs']
+    assert sum(len(hashes) for hashes, _ in runs) == (kept['basket_date'] >= last_day).sum()
+
+
+def test_hash_collisions_do_not_drop_distinct_rows(duplicates, monkeypatch):
+    # Dört farklı karma değeri: neredeyse her satır çifti çakışır
+    monkeypatch.setattr(temizlik, 'hash64', lambda values: values & np.uint64(3))
+    sample = duplicates.iloc[:6_000]
+    kept, _ = _drop_in_chunks(sample, DropDuplicates(), 1_500)
+    pd.testing.assert_frame_equal(kept, sample[~sample.duplicated()])
+
+
+def test_drop_duplicates_on_categorical_columns():
+    values = pd.DataFrame({'sex': ['Male', 'Female', 'Male', 'Diğer', 'Female', None],
+                           'basket_count': [1, 2, 1, 3, 2, 4]})
+    # Parçalar kategorileri farklı sırayla görür; kodlar yine aynı değeri temsil etmeli
+    chunks = [values.iloc[:3].astype({'sex': 'category'}), values.iloc[3:].astype({'sex': 'category'})]
+    rule, state = DropDuplicates(), {}
+    drops = [rule.drop(chunk, np.ones(len(chunk), dtype=bool), state, None) for chunk in chunks]
+    np.testing.assert_array_equal(np.concatenate(drops), values.duplicated().to_numpy())
+
+
+def test_drop_duplicates_rejects_text_columns():
+    df = pd.DataFrame({'note': ['a', 'a']})
+    with pytest.raises(ValueError, match='note'):
+        DropDuplicates().drop(df, np.ones(2, dtype=bool), {}, None)
+
+
+@pytest.mark.parametrize('profile', ['standart', 'siki'])
+def test_chunked_cleaning_matches_whole_table(duplicate_dir, duplicates, profile):
+    customer_cleaner, whole = cleaners(profile)
+    index = CustomerIndex(customer_cleaner.clean(read_customers(str(duplicate_dir / CUSTOMER_FILE))))
+    expected = whole.clean(duplicates, index)
+    chunked = whole.spawn()
+    kept = pd.concat([chunked.clean(duplicates.iloc[start:start + 4_000], index)
+                      for start in range(0, len(duplicates), 4_000)])
+    pd.testing.assert_frame_equal(kept, expected)
+    assert chunked.counts == whole.counts
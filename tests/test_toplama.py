@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from conftest import assert_summary_equal
+from girdi import split_daily
+from hazirlik import BASKET_FILE, CUSTOMER_FILE, CustomerIndex
+from kolon_deposu import BasketStore
+from paralel import aggregate_parallel
+from satis_analizi import REPORTS, SalesAnalysis
+from toplama import aggregate_stream, load_state, save_state
+
+
+@pytest.fixture(scope='module')
+def memory(basket_path, customer_path):
+    return SalesAnalysis(basket_path, customer_path)
+
+
+@pytest.fixture(scope='module')
+def daily_dir(basket_path, tmp_path_factory):
+    path = tmp_path_factory.mktemp('bolumler')
+    split_daily(basket_path, str(path))
+    return str(path)
+
+
+def test_stream_matches_memory(memory, basket_path, customer_path):
+    stream = SalesAnalysis(basket_path, customer_path, chunksize=3_000)
+    assert_summary_equal(stream.summary, memory.summary)
+    for name in REPORTS:
+        pd.testing.assert_frame_equal(pd.DataFrame(stream.report(name)), pd.DataFrame(memory.report(name)))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_matches_memory(memory, basket_path, workers):
+    index = CustomerIndex(memory.customers)
+    aggregator = aggregate_parallel(index, basket_path, workers, chunksize=3_000, partition_bytes=64 * 1024)
+    assert_summary_equal(aggregator.result(), memory.summary)
+    assert index.unmatched_rows == memory.customer_index.unmatched_rows
+
+
+def test_partitioned_and_store_sources_match_csv(memory, daily_dir, customer_path, tmp_path):
+    store = str(tmp_path / 'depo')
+    BasketStore.create(store, memory.basket_path)
+    for source in [daily_dir, store]:
+        assert_summary_equal(SalesAnalysis(source, customer_path).summary, memory.summary)
+        assert_summary_equal(SalesAnalysis(source, customer_path, chunksize=3_000, workers=2).summary,
+                             memory.summary)
+
+
+def test_strict_cleaning_is_the_same_in_every_mode(duplicate_dir, tmp_path):
+    basket, customers = str(duplicate_dir / BASKET_FILE), str(duplicate_dir / CUSTOMER_FILE)
+    daily = str(tmp_path / 'bolumler')
+    split_daily(basket, daily)
+    expected = SalesAnalysis(basket, customers, cleaning='siki')
+    for analysis in [SalesAnalysis(basket, customers, chunksize=3_000, cleaning='siki'),
+                     SalesAnalysis(basket, customers, chunksize=3_000, workers=2, cleaning='siki'),
+                     SalesAnalysis(daily, customers, chunksize=3_000, workers=2, cleaning='siki')]:
+        assert_summary_equal(analysis.summary, expected.summary)
+        pd.testing.assert_series_equal(analysis.cleaning_report, expected.cleaning_report)
+    assert expected.cleaning_report['Tekrar eden sepet satırları atıldı'] > 0
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_incremental_run_matches_full_run(memory, basket_path, tmp_path, workers):
+    basket = pd.read_csv(basket_path)
+    first = tmp_path / 'ilk.csv'
+    basket[basket['basket_date'] < '2019-06-05'].to_csv(first, index=False)
+
+    def aggregate(path, aggregator=None):
+        if workers:
+            return aggregate_parallel(index, path, workers, aggregator=aggregator, chunksize=3_000,
+                                      partition_bytes=64 * 1024)
+        return aggregate_stream(index, path, 3_000, aggregator=aggregator)
+
+    index = CustomerIndex(memory.customers)
+    state = str(tmp_path / 'durum.pkl')
+    save_state(aggregate(str(first)), index, 'anahtar', path=state)
+
+    index = CustomerIndex(memory.customers)
+    assert load_state(index, 'baska', path=state) is None
+    aggregator = load_state(index, 'anahtar', path=state)
+    # Tam dosya yeniden verilir: watermark'a kadarki günler tekrar sayılmamalı
+    aggregate(basket_path, aggregator)
+    assert_summary_equal(aggregator.result(), memory.summary)
+    assert index.unmatched_rows == memory.customer_index.unmatched_rows
+
+
+def test_raw_and_cleaned_row_counts(duplicate_dir):
+    analysis = SalesAnalysis(str(duplicate_dir / BASKET_FILE), str(duplicate_dir / CUSTOMER_FILE),
+                             chunksize=3_000, cleaning='siki')
+    aggregator = analysis.aggregator
+    assert aggregator.input_rows == len(pd.read_csv(duplicate_dir / BASKET_FILE))
+    assert aggregator.input_rows - aggregator.row_count == analysis.basket_cleaner.dropped
+
+
+def test_rfm_state_is_opt_in(memory, basket_path, customer_path):
+    assert memory.summary.customer_stats is None
+    index = CustomerIndex(memory.customers)
+    summary = aggregate_stream(index, basket_path, 3_000, rfm=True).result()
+    assert summary.n_customers == len(summary.customer_stats) == memory.merged['customer_id'].nunique()
+    pd.testing.assert_frame_equal(summary.customer_stats.rfm(), memory.rfm)
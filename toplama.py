@@ -0,0 +1,379 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from hazirlik import (DAY_LABELS_TR, DAY_ORDER, FEATURE_COLUMNS, add_features,
+                      parse_basket_dates, read_basket, resolve_basket)
+from en_cok_satan import top_k
+from onbellek import CACHE_DIR
+from rfm import CustomerStats
+from tekil_sayim import ExactDistinct
+
+# Artımlı modda toplam durumunun saklandığı dosya
+STATE_FILE = os.path.join(CACHE_DIR, 'toplam_durumu.pkl')
+STATE_VERSION = 5
+
+# Tüm segment ve zaman raporlarının türetildiği küp boyutları
+SEGMENT_KEYS = ['basket_date', 'sex', 'age_group', 'tenure_group']
+# Bekleyen kısmi toplamlar en az bu kadar satıra ulaşınca birleştirilir
+COMBINE_MIN = 1 << 18
+
+
+# ============================================================
+# YARDIMCI FONKSİYONLAR
+# ============================================================
+
+def combine(parts, levels=0):
+    """Kısmi toplamları tek bir concat + groupby ile birleştirir; int64 tipini ve sıralı indeksi korur."""
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).groupby(level=levels, dropna=False, observed=True).sum()
+
+
+class PartialSums:
+    """Parça parça gelen kısmi toplam tablolarını biriktirir (bkz. combine).
+
+    Her parçada birikmiş tablonun tamamını yeniden gruplamak parça sayısı ×
+    anahtar sayısı kadar iş yapardı. Tablolar bekletilir; bekleyen satırlar
+    birleştirilmiş tablo kadar (en az COMBINE_MIN) olunca hepsi bir kez
+    birleştirilir (rfm.CustomerStats gibi), result() kalanları birleştirir.
+    """
+
+    def __init__(self, levels=0):
+        self.levels = levels
+        self._parts = []
+        self._pending = 0
+        self._size = 0
+
+    def add(self, part):
+        self._parts.append(part)
+        self._pending += len(part)
+        if self._pending > max(self._size, COMBINE_MIN):
+            self._compact()
+        return self
+
+    def merge(self, other):
+        for part in other._parts:
+            self.add(part)
+        return self
+
+    def _compact(self):
+        if len(self._parts) > 1:
+            self._parts = [combine(self._parts, self.levels)]
+        self._size = len(self._parts[0]) if self._parts else 0
+        self._pending = 0
+
+    def result(self):
+        """Birleştirilmiş tablo (henüz parça yoksa None)."""
+        self._compact()
+        return self._parts[0] if self._parts else None
+
+
+def segment_cube(df):
+    """Tarih × cinsiyet × yaş grubu × sadakat grubu üzerinde tek geçişte sum/count.
+
+    Eksik segment değerleri (eşleşmeyen müşteriler) küpte NaN anahtarla tutulur;
+    böylece örneğin yaşı bilinmeyen bir satır yine de cinsiyet toplamına girer.
+    """
+    return df.groupby(SEGMENT_KEYS, dropna=False, observed=True)['basket_count'].agg(['sum', 'count'])
+
+
+def rollup(cube, by):
+    """Küpü tek bir boyuta (veya boyut listesine) indirger; NaN anahtarlar düşer."""
+    return cube.groupby(by, observed=True).sum()
+
+
+def _with_mean(table):
+    # sum/mean/count sırası groupby(...).agg(['sum', 'mean', 'count']) ile aynı
+    table = table[['sum', 'count']].copy()
+    table.insert(1, 'mean', table['sum'] / table['count'])
+    return table
+
+
+def _missing_counts(df, columns):
+    """Kolon başına eksik değer sayısı (isnull().sum() ile aynı); NaN tutamayan
+    numpy tamsayı/bool kolonlar taranmaz (nullable UInt16 gibi tipler taranır)."""
+    return pd.Series([0 if isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind in 'iub'
+                      else int(df[c].isna().sum()) for c in columns],
+                     index=columns, dtype='int64')
+
+
+def _median_from_counts(value_counts):
+    """Değer frekanslarından tam (exact) medyanı hesaplar."""
+    value_counts = value_counts.sort_index()
+    n = int(value_counts.sum())
+    cumulative = value_counts.cumsum().to_numpy()
+    values = value_counts.index.to_numpy()
+    lower = values[np.searchsorted(cumulative, (n - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, n // 2, side='right')]
+    return (lower + upper) / 2
+
+
+# ============================================================
+# SATIŞ ÖZETİ
+# ============================================================
+
+class SalesSummary:
+    """Rapor, grafik ve önerilerin ihtiyaç duyduğu tüm toplu tablolar."""
+
+    def __init__(self, **tables):
+        self.__dict__.update(tables)
+
+
+class SalesAggregator:
+    """Birleştirilmiş sepet parçalarını (chunk) çalışan toplamlara katlar.
+
+    Her parça için iki toplu tablo tutulur: ürün bazında sum/count ve tarih ×
+    segment küpü; eşsiz müşteriler ExactDistinct ile sayılır. rfm=True ise
+    müşteri başına RFM ve haftalık etkinlik durumu ayrıca CustomerStats'ta
+    birikir (bkz. rfm.py). Cinsiyet, yaş, gün, haftanın günü, sadakat ve
+    yaş×cinsiyet raporlarının hepsi bu küpten türetilir; ham tablo raporlar
+    için yalnızca bir kez taranır. Bellekteki yol tüm tabloyu tek parça olarak
+    verir, böylece iki yol aynı sonucu üretir.
+    """
+
+    def __init__(self, rfm=False):
+        self.rfm = rfm
+        # Temizlikten önceki (ham) ve toplamlara katılan sepet satırları
+        self.input_rows = 0
+        self.row_count = 0
+        self.basket_columns = None
+        self.merged_columns = None
+        self._missing = None
+        self._total_sales = 0
+        self._count_hist = PartialSums()
+        self._distinct = ExactDistinct()
+        self._customers = CustomerStats() if rfm else None
+        self._products = PartialSums()
+        self._cube = PartialSums(levels=list(range(len(SEGMENT_KEYS))))
+        self._date_min = None
+        self._date_max = None
+
+    @property
+    def watermark(self):
+        """Toplamlara katılmış en son basket_date (henüz veri yoksa None)."""
+        return self._date_max
+
+    def update(self, df):
+        """Özellikleri eklenmiş birleştirilmiş bir parçayı toplamlara ekler."""
+        if len(df) == 0:
+            return self
+        if self.merged_columns is None:
+            self.merged_columns = [c for c in df.columns if c not in FEATURE_COLUMNS]
+
+        self.input_rows += len(df)
+        self.row_count += len(df)
+        counts = df['basket_count']
+        self._total_sales += int(counts.sum())
+        missing = _missing_counts(df, self.merged_columns)
+        self._missing = missing if self._missing is None else self._missing + missing
+        self._count_hist.add(counts.value_counts())
+        self._distinct.update(df['customer_id'].to_numpy())
+        if self.rfm:
+            self._customers.update(df)
+
+        dates = df['basket_date']
+        self._date_min = dates.min() if self._date_min is None else min(self._date_min, dates.min())
+        self._date_max = dates.max() if self._date_max is None else max(self._date_max, dates.max())
+
+        # Kompakt int16 adetlerin toplamları int64'e yükseltilir
+        products = df.groupby('product_id')['basket_count'].agg(['sum', 'count']).astype('int64')
+        self._products.add(products)
+        self._cube.add(segment_cube(df).astype('int64'))
+        return self
+
+    def merge(self, other):
+        """Başka bir parçada veya süreçte doldurulmuş toplamları ekler.
+
+        Tüm toplamlar toplanabilir olduğundan sonuç, aynı satırların tek bir
+        aggregator'a update() ile verilmesiyle aynıdır.
+        """
+        self.input_rows += other.input_rows
+        if other.row_count == 0:
+            return self
+        if self.basket_columns is None:
+            self.basket_columns = other.basket_columns
+        if self.merged_columns is None:
+            self.merged_columns = other.merged_columns
+
+        self.row_count += other.row_count
+        self._total_sales += other._total_sales
+        self._missing = other._missing if self._missing is None else self._missing + other._missing
+        self._count_hist.merge(other._count_hist)
+        self._distinct.merge(other._distinct)
+        if self.rfm:
+            self._customers.merge(other._customers)
+        self._date_min = other._date_min if self._date_min is None else min(self._date_min, other._date_min)
+        self._date_max = other._date_max if self._date_max is None else max(self._date_max, other._date_max)
+        self._products.merge(other._products)
+        self._cube.merge(other._cube)
+        return self
+
+    def result(self):
+        products = self._products.result()
+        cube = self._cube.result()
+        dates = cube.index.get_level_values('basket_date')
+        day_of_week = rollup(cube, dates.day_name().rename('day_of_week'))
+        return SalesSummary(
+            row_count=self.row_count,
+            basket_columns=self.basket_columns,
+            merged_columns=self.merged_columns,
+            missing=self._missing,
+            total_sales=self._total_sales,
+            n_customers=len(self._distinct),
+            customer_stats=self._customers,
+            n_products=len(products),
+            mean_basket=self._total_sales / self.row_count,
+            median_basket=_median_from_counts(self._count_hist.result()),
+            date_min=self._date_min,
+            date_max=self._date_max,
+            products=products,
+            product_sales=products['sum'],
+            daily=rollup(cube, 'basket_date')['sum'],
+            sex=_with_mean(rollup(cube, 'sex')),
+            age_group=_with_mean(rollup(cube, 'age_group')),
+            day_of_week=_with_mean(day_of_week),
+            tenure=_with_mean(rollup(cube, 'tenure_group').rename_axis('tenure')),
+            gender_age=rollup(cube, ['age_group', 'sex'])['sum'].unstack(fill_value=0),
+        )
+
+
+# ============================================================
+# RAPOR TABLOLARI (AŞAMA 2)
+# ============================================================
+SALES_COLUMNS = ['Toplam Satış', 'Ortalama Sepet', 'Sipariş Sayısı']
+
+
+def _with_share(table):
+    table.columns = SALES_COLUMNS
+    table['Yüzde'] = (table['Toplam Satış'] / table['Toplam Satış'].sum() * 100).round(2)
+    return table
+
+
+def top_products_table(summary, n=10):
+    table = top_k(summary.products, n)
+    table.columns = ['Toplam Satış', 'Sipariş Sayısı']
+    return table
+
+
+def gender_table(summary):
+    return _with_share(summary.sex.copy())
+
+
+def age_table(summary):
+    return _with_share(summary.age_group.sort_index())
+
+
+def daily_table(summary):
+    return summary.daily
+
+
+def day_of_week_table(summary):
+    table = summary.day_of_week.reindex(DAY_ORDER)
+    table.columns = SALES_COLUMNS
+    table.index = DAY_LABELS_TR
+    return table
+
+
+def tenure_table(summary):
+    return _with_share(summary.tenure.copy())
+
+
+# Raporun altı analizi: ad → özetten tablo üreten fonksiyon
+ANALYSES = {
+    'top_products': top_products_table,
+    'gender_sales': gender_table,
+    'age_sales': age_table,
+    'daily_sales': daily_table,
+    'day_sales': day_of_week_table,
+    'tenure_sales': tenure_table,
+}
+
+
+# ============================================================
+# AKIŞ (STREAMING) MODU
+# ============================================================
+
+def enriched_chunks(customer_index, basket_path, chunksize, after=None, cleaner=None):
+    """Sepet dosyasını chunksize satırlık parçalarla okur; her parçayı birleştirilmiş
+    ve özellikleri eklenmiş olarak döner. after verilirse yalnızca o günden
+    sonraki satırlar kalır; cleaner (bkz. temizlik.Cleaner) verilirse sepet
+    kuralları birleştirmeden önce her parçaya uygulanır. Kaynak güne göre
+    sıralıysa (kolon deposu) temizliğe biten günler bildirilir (Cleaner.advance)."""
+    source = resolve_basket(basket_path)
+    ordered = cleaner is not None and getattr(source, 'day_ordered', False)
+    for chunk in read_basket(source, chunksize=chunksize):
+        chunk = parse_basket_dates(chunk)
+        if ordered and len(chunk):
+            cleaner.advance(chunk['basket_date'].iloc[0])
+        if after is not None:
+            chunk = chunk[chunk['basket_date'] > after]
+        if cleaner is not None:
+            chunk = cleaner.clean(chunk, customer_index)
+        yield add_features(customer_index.enrich(chunk))
+
+
+def aggregate_stream(customer_index, basket_path, chunksize, aggregator=None, after=None, cleaner=None,
+                     rfm=False):
+    """Sepet dosyasını chunksize satırlık parçalarla okuyup toplar.
+
+    Tam sepet tablosu hiçbir zaman belleğe alınmaz; her parça bellekteki
+    müşteri indeksiyle zenginleştirilip hemen toplamlara katlanır. Daha önce
+    doldurulmuş bir aggregator verilirse yalnızca watermark'tan (veya after
+    verildiyse o günden) sonraki günlere ait satırlar eklenir. rfm yeni
+    aggregator'ın müşteri durumunu da tutup tutmayacağıdır (bkz. SalesAggregator).
+    """
+    aggregator = SalesAggregator(rfm=rfm) if aggregator is None else aggregator
+    after = aggregator.watermark if after is None else after
+    dropped = cleaner.dropped if cleaner is not None else 0
+    for chunk in enriched_chunks(customer_index, basket_path, chunksize, after=after, cleaner=cleaner):
+        if aggregator.basket_columns is None:
+            aggregator.basket_columns = [c for c in chunk.columns
+                                         if c not in customer_index.columns and c not in FEATURE_COLUMNS]
+        aggregator.update(chunk)
+    # Temizlikte atılan satırlar da ham satır sayısına girer
+    if cleaner is not None:
+        aggregator.input_rows += cleaner.dropped - dropped
+    return aggregator
+
+
+# ============================================================
+# ARTIMLI (INCREMENTAL) GÜNCELLEME
+# ============================================================
+
+def save_state(aggregator, customer_index, customer_key, path=STATE_FILE):
+    """Toplam durumunu ve müşteri eşleşme sayaçlarını diske yazar."""
+    state = {
+        'version': STATE_VERSION,
+        'customer_key': customer_key,
+        'aggregator': aggregator,
+        'unmatched_rows': customer_index.unmatched_rows,
+        'unmatched_ids': customer_index.unmatched_ids,
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+
+def load_state(customer_index, customer_key, path=STATE_FILE, rfm=False):
+    """Kayıtlı toplam durumunu yükler.
+
+    Durum yoksa, eski bir sürüme aitse ya da müşteri tablosu değiştiyse None
+    döner; segment toplamları müşteri niteliklerine bağlı olduğundan bu
+    durumda tam hesaplama gerekir. rfm=True istenip durum müşteri durumu
+    olmadan kaydedildiyse de None döner.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != STATE_VERSION or state.get('customer_key') != customer_key:
+        return None
+    if rfm and not state['aggregator'].rfm:
+        return None
+    customer_index.unmatched_rows = state['unmatched_rows']
+    customer_index.unmatched_ids = state['unmatched_ids']
+    return state['aggregator']